@@ -1,5 +1,17 @@
+import argparse
 import csv
+import heapq
+import mmap
 import os
+import struct
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+from labtools import best_time
+
 
 class CountryInfo:
     def __init__(self, country, capital, continent, population, language):
@@ -9,46 +21,549 @@ class CountryInfo:
         self.population = population
         self.language = language
 
+    def to_dict(self):
+        return {
+            'country': self.country,
+            'capital': self.capital,
+            'continent': self.continent,
+            'population': self.population,
+            'language': self.language,
+        }
+
     def __str__(self):
         return f"Country: {self.country}, Capital: {self.capital}, Continent: {self.continent}, Population: {self.population}, Language: {self.language}"
 
 
+def normalize_key(name):
+    """Case-folded, Unicode-normalized form of a name used for every lookup and sort."""
+    return unicodedata.normalize('NFKC', name).casefold()
+
+
+def gallop_left(keys, key, low):
+    """bisect_left(keys, key, low), probing 1, 2, 4, ... keys ahead first.
+
+    Costs O(log d) for an answer d keys past low, so a sorted batch of m
+    lookups takes O(m log(n / m)): never more than a full merge walk, and
+    O(log n) for a single name.
+    """
+    size = len(keys)
+    step = 1
+    high = low
+    while high < size and keys[high] < key:
+        low = high + 1
+        high = low + step
+        step *= 2
+    return bisect_left(keys, key, low, min(high, size))
+
+
+# Precomputed normalized keys, kept sorted next to the rows they belong to
+class NormalizedKeyIndex:
+    def __init__(self, names, rows=None):
+        """names must already be sorted by normalize_key.
+
+        rows gives the row number of each name when the rows themselves are not
+        stored in key order; without it a key's position is its row number.
+        """
+        self.keys = [normalize_key(name) for name in names]
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _row(self, i):
+        return self.rows[i] if self.rows is not None else i
+
+    def find(self, name):
+        """Returns the row of name, or -1 if it is not in the index."""
+        key = normalize_key(name)
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return self._row(i)
+        return -1
+
+    def find_many(self, names):
+        """Returns the row (or -1) of every name, in the order given.
+
+        The queries are sorted once and then galloped forward through the keys,
+        so no key is passed over twice and a small batch only costs m searches.
+        """
+        queries = sorted((normalize_key(name), pos) for pos, name in enumerate(names))
+        results = [-1] * len(queries)
+        keys = self.keys
+        i = 0
+        for key, pos in queries:
+            i = gallop_left(keys, key, i)
+            if i < len(keys) and keys[i] == key:
+                results[pos] = self._row(i)
+        return results
+
+    def insert(self, name, row=None):
+        """Inserts name in key order and returns the position it went to."""
+        key = normalize_key(name)
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        if self.rows is not None:
+            self.rows.insert(i, row)
+        return i
+
+    def remove(self, name):
+        """Removes name and returns the position it had, or -1 if it was missing."""
+        key = normalize_key(name)
+        i = bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return -1
+        del self.keys[i]
+        if self.rows is not None:
+            del self.rows[i]
+        return i
+
+
+# Sorted secondary index: keys kept in order next to the row numbers they point to
+class SortedIndex:
+    def __init__(self, entries, typecode=None):
+        entries = sorted(entries)
+        if typecode:
+            self.keys = array(typecode, (key for key, row in entries))
+        else:
+            self.keys = [key for key, row in entries]
+        self.rows = array('l', (row for key, row in entries))
+
+    def lookup(self, key):
+        """Returns the row numbers stored under key."""
+        return self.rows[bisect_left(self.keys, key):bisect_right(self.keys, key)]
+
+    def range(self, low, high):
+        """Returns the row numbers whose key is between low and high (inclusive)."""
+        return self.rows[bisect_left(self.keys, low):bisect_right(self.keys, high)]
+
+    def insert(self, key, row):
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.rows.insert(i, row)
+
+    def remove(self, key, row):
+        low = bisect_left(self.keys, key)
+        high = bisect_right(self.keys, key)
+        for i in range(low, high):
+            if self.rows[i] == row:
+                del self.keys[i]
+                del self.rows[i]
+                return
+
+
+# Columnar storage: one list per field instead of one CountryInfo object per row.
+# Rows are stored in arrival order; the indexes hold them in sorted order, so
+# appending never moves existing rows. Removed rows are only dropped from the
+# indexes and stay in the columns until the next full load.
+class ColumnarCountryStore:
+    def __init__(self, rows=()):
+        """rows is an iterable of (country, capital, continent, population, language) tuples."""
+        self.names = []
+        self.capitals = []
+        self.continents = []
+        self.populations = array('q')
+        self.languages = []
+        self.append(rows, update_indexes=False)
+        self.build_indexes()
+
+    def build_indexes(self):
+        """Builds the name key index and the sorted secondary indexes on capital, continent, language and population."""
+        order = sorted(range(len(self.names)), key=lambda i: normalize_key(self.names[i]))
+        self.key_index = NormalizedKeyIndex((self.names[i] for i in order), array('l', order))
+        self.capital_index = SortedIndex((normalize_key(self.capitals[i]), i) for i in order)
+        self.continent_index = SortedIndex((normalize_key(self.continents[i]), i) for i in order)
+        self.language_index = SortedIndex(
+            (key, i) for i in order for key in self._language_keys(self.languages[i])
+        )
+        self.population_index = SortedIndex(((self.populations[i], i) for i in order), 'q')
+
+    @staticmethod
+    def _language_keys(languages):
+        # Countries like "Pashto/Dari" are indexed under each of their languages
+        return [normalize_key(language.strip()) for language in languages.split('/')]
+
+    def __len__(self):
+        return len(self.key_index)
+
+    def row(self, i):
+        """Builds the CountryInfo for row i only when it is actually needed."""
+        return CountryInfo(self.names[i], self.capitals[i], self.continents[i], self.populations[i], self.languages[i])
+
+    def rows(self, row_numbers):
+        return [self.row(i) for i in row_numbers]
+
+    def append(self, rows, update_indexes=True):
+        """Appends rows to the columns, inserting them into the indexes unless they will be rebuilt."""
+        for country, capital, continent, population, language in rows:
+            i = len(self.names)
+            self.names.append(sys.intern(country))
+            self.capitals.append(sys.intern(capital))
+            self.continents.append(sys.intern(continent))
+            self.populations.append(population)
+            self.languages.append(sys.intern(language))
+            if update_indexes:
+                self._index_row(i)
+
+    def _index_row(self, i):
+        self.key_index.insert(self.names[i], i)
+        self.capital_index.insert(normalize_key(self.capitals[i]), i)
+        self.continent_index.insert(normalize_key(self.continents[i]), i)
+        for key in self._language_keys(self.languages[i]):
+            self.language_index.insert(key, i)
+        self.population_index.insert(self.populations[i], i)
+
+    def remove(self, i):
+        """Drops row i from every index."""
+        self.key_index.remove(self.names[i])
+        self.capital_index.remove(normalize_key(self.capitals[i]), i)
+        self.continent_index.remove(normalize_key(self.continents[i]), i)
+        for key in self._language_keys(self.languages[i]):
+            self.language_index.remove(key, i)
+        self.population_index.remove(self.populations[i], i)
+
+
+def read_rows(csv_filename):
+    """Yields one (country, capital, continent, population, language) tuple per CSV line."""
+    with open(csv_filename, newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header is None:
+            return
+        column = {name: i for i, name in enumerate(header)}
+        country, capital, continent, population, language = (
+            column[name] for name in ('Country', 'Capital', 'Continent', 'Population', 'Language')
+        )
+        for line in reader:
+            if line:
+                yield line[country], line[capital], line[continent], int(line[population]), line[language]
+
+
+def read_chunks(rows, chunk_size):
+    """Groups rows into lists of at most chunk_size rows."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Binary snapshot layout (all integers little-endian):
+#   header          magic, version, row count
+#   key offsets     n + 1 uint64 file positions of the normalized name keys
+#   record offsets  n + 1 uint64 file positions of the packed rows
+#   keys            utf-8 normalized names, in sorted order
+#   records         population (int64), four uint16 lengths, then the utf-8
+#                   country, capital, continent and language
+SNAPSHOT_MAGIC = b'CDBS'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<4sIQ')
+SNAPSHOT_RECORD = struct.Struct('<qHHHH')
+
+
+def write_snapshot(path, rows):
+    """Writes rows (already sorted by normalize_key) to a binary snapshot file."""
+    keys = bytearray()
+    records = bytearray()
+    key_offsets = array('Q', [0])
+    record_offsets = array('Q', [0])
+    count = 0
+    for country, capital, continent, population, language in rows:
+        keys += normalize_key(country).encode('utf-8')
+        fields = [field.encode('utf-8') for field in (country, capital, continent, language)]
+        records += SNAPSHOT_RECORD.pack(population, *(len(field) for field in fields))
+        for field in fields:
+            records += field
+        key_offsets.append(len(keys))
+        record_offsets.append(len(records))
+        count += 1
+
+    # Turn the offsets into absolute file positions
+    keys_start = SNAPSHOT_HEADER.size + 2 * 8 * (count + 1)
+    records_start = keys_start + len(keys)
+    key_offsets = array('Q', (keys_start + offset for offset in key_offsets))
+    record_offsets = array('Q', (records_start + offset for offset in record_offsets))
+    if sys.byteorder == 'big':
+        key_offsets.byteswap()
+        record_offsets.byteswap()
+
+    with open(path, 'wb') as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, count))
+        key_offsets.tofile(f)
+        record_offsets.tofile(f)
+        f.write(keys)
+        f.write(records)
+
+
+# The normalized keys of a snapshot as a read-only sequence, so bisect can search them in place
+class MappedKeys:
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return self.store.count
+
+    def __getitem__(self, i):
+        return self.store._key(i)
+
+
+# Read-only view of a snapshot file; rows are decoded straight from the mapped pages
+class SnapshotCountryStore:
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = SNAPSHOT_HEADER.unpack_from(self.mm, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(f"'{path}' is not a country snapshot (version {SNAPSHOT_VERSION}).")
+        self.count = count
+        self.view = memoryview(self.mm)
+        table_size = 8 * (count + 1)
+        if sys.byteorder == 'little':
+            self.key_offsets = self.view[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + table_size].cast('Q')
+            self.record_offsets = self.view[SNAPSHOT_HEADER.size + table_size:SNAPSHOT_HEADER.size + 2 * table_size].cast('Q')
+        else:
+            # Big-endian hosts pay for one copy of the offset tables
+            self.key_offsets = array('Q', self.mm[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + table_size])
+            self.record_offsets = array('Q', self.mm[SNAPSHOT_HEADER.size + table_size:SNAPSHOT_HEADER.size + 2 * table_size])
+            self.key_offsets.byteswap()
+            self.record_offsets.byteswap()
+        self.keys = MappedKeys(self)
+
+    def close(self):
+        for name in ('key_offsets', 'record_offsets', 'view'):
+            view = getattr(self, name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        self.mm.close()
+        self.file.close()
+
+    def __len__(self):
+        return self.count
+
+    def _key(self, i):
+        return self.mm[self.key_offsets[i]:self.key_offsets[i + 1]]
+
+    def find(self, name):
+        """Returns the row of name, or -1 if it is not in the snapshot."""
+        key = normalize_key(name).encode('utf-8')
+        i = bisect_left(self.keys, key)
+        if i < self.count and self._key(i) == key:
+            return i
+        return -1
+
+    def find_many(self, names):
+        """Same galloping walk as NormalizedKeyIndex.find_many; only the probed key pages are read."""
+        queries = sorted((normalize_key(name).encode('utf-8'), pos) for pos, name in enumerate(names))
+        results = [-1] * len(queries)
+        i = 0
+        for key, pos in queries:
+            i = gallop_left(self.keys, key, i)
+            if i < self.count and self._key(i) == key:
+                results[pos] = i
+        return results
+
+    def fields(self, i):
+        """Returns row i as a (country, capital, continent, population, language) tuple."""
+        start = self.record_offsets[i]
+        population, *lengths = SNAPSHOT_RECORD.unpack_from(self.mm, start)
+        start += SNAPSHOT_RECORD.size
+        strings = []
+        for length in lengths:
+            strings.append(str(self.mm[start:start + length], 'utf-8'))
+            start += length
+        country, capital, continent, language = strings
+        return country, capital, continent, population, language
+
+    def name(self, i):
+        start = self.record_offsets[i] + SNAPSHOT_RECORD.size
+        length = SNAPSHOT_RECORD.unpack_from(self.mm, self.record_offsets[i])[1]
+        return str(self.mm[start:start + length], 'utf-8')
+
+    def row(self, i):
+        return CountryInfo(*self.fields(i))
+
+    def iter_rows(self):
+        for i in range(self.count):
+            yield self.fields(i)
+
+
 class CountryDatabase:
-    def __init__(self, csv_filename):
-        self.countries = []
-        self.load_data(csv_filename)
+    def __init__(self, csv_filename, columnar=False, chunk_size=10000):
+        self._setup(csv_filename, columnar, chunk_size)
         if not os.path.exists(csv_filename):
             print(f"File '{csv_filename}' not found!")
+            if columnar:
+                # An empty store, so lookups miss and appends work like on a loaded database
+                self.store = ColumnarCountryStore()
+                self.key_index = self.store.key_index
             return
-       
+        self.load_data(csv_filename)
+
+    def _setup(self, csv_filename, columnar, chunk_size):
+        """The empty state shared by __init__ and open_snapshot."""
+        self.countries = []
+        self.store = None  # ColumnarCountryStore when columnar=True
+        self.key_index = NormalizedKeyIndex([])  # Index over the country names
+        self.columnar = columnar
+        self.snapshot = None  # SnapshotCountryStore when opened with open_snapshot
+        self._search_index = None  # CountrySearchIndex, built on first use
+        self._aggregate_cache = {}  # aggregate() results, dropped whenever the data changes
+        self.chunk_size = chunk_size
+        self.csv_filename = csv_filename
 
     def load_data(self, csv_filename):
-        """Loads data from the CSV file and stores it in a list of CountryInfo objects."""
-        with open(csv_filename, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                country_info = CountryInfo(
-                    row['Country'],
-                    row['Capital'],
-                    row['Continent'],
-                    int(row['Population']),
-                    row['Language']
-                )
-                self.countries.append(country_info)
-        # Sort the list of countries alphabetically for binary search
-        self.countries.sort(key=lambda country: country.country)
+        """Streams the CSV file in chunks and builds the sorted country list (or columns) and its index."""
+        self._invalidate()
+        chunks = read_chunks(read_rows(csv_filename), self.chunk_size)
+        if self.columnar:
+            # Only the columns are kept, CountryInfo objects are built on demand
+            self.store = ColumnarCountryStore()
+            for chunk in chunks:
+                self.store.append(chunk, update_indexes=False)
+            self.store.build_indexes()
+            self.key_index = self.store.key_index
+            return
+        self.countries = []
+        for chunk in chunks:
+            chunk = [CountryInfo(*row) for row in chunk]
+            chunk.sort(key=lambda country: normalize_key(country.country))
+            self.countries.extend(chunk)
+        # Every chunk is already a sorted run, so this sort only merges the runs
+        self.countries.sort(key=lambda country: normalize_key(country.country))
+        self.key_index = NormalizedKeyIndex(country.country for country in self.countries)
+
+    def save_snapshot(self, path):
+        """Writes the loaded countries to a binary snapshot that open_snapshot can map back in."""
+        write_snapshot(path, self.iter_rows())
+
+    @classmethod
+    def open_snapshot(cls, path, chunk_size=10000):
+        """Opens a snapshot written by save_snapshot without parsing or sorting anything.
+
+        Lookups read straight from the memory-mapped file, so processes that open
+        the same snapshot share its pages. The database is read-only.
+        """
+        database = cls.__new__(cls)
+        database._setup(None, False, chunk_size)
+        database.snapshot = SnapshotCountryStore(path)
+        database.key_index = database.snapshot
+        return database
+
+    def close(self):
+        """Unmaps the snapshot file, if one is open."""
+        if self.snapshot is not None:
+            self.snapshot.close()
+
+    def iter_rows(self):
+        """Yields every country as a (country, capital, continent, population, language) tuple, in key order."""
+        if self.snapshot is not None:
+            yield from self.snapshot.iter_rows()
+        elif self.columnar:
+            store = self.store
+            for i in self.key_index.rows:
+                yield store.names[i], store.capitals[i], store.continents[i], store.populations[i], store.languages[i]
+        else:
+            for c in self.countries:
+                yield c.country, c.capital, c.continent, c.population, c.language
+
+    def _invalidate(self):
+        """Drops everything derived from the loaded rows after they change."""
+        self._search_index = None
+        self._aggregate_cache = {}
+        if not self.columnar:
+            self.store = None  # The columns built from the objects are stale now
+
+    def _check_writable(self):
+        if self.snapshot is not None:
+            raise ValueError("Databases opened from a snapshot are read-only.")
+
+    def append_rows(self, rows):
+        """Adds or replaces countries, updating the index in place instead of re-sorting.
+
+        rows are (country, capital, continent, population, language) tuples; a
+        row for a country that is already loaded replaces it.
+        """
+        self._check_writable()
+        for row in rows:
+            self._remove(row[0])
+            if self.columnar:
+                self.store.append([row])
+            else:
+                i = self.key_index.insert(row[0])
+                self.countries.insert(i, CountryInfo(*row))
+        self._invalidate()
+
+    def _remove(self, country_name):
+        if self.columnar:
+            i = self.key_index.find(country_name)
+            if i >= 0:
+                self.store.remove(i)
+        else:
+            i = self.key_index.remove(country_name)
+            if i >= 0:
+                del self.countries[i]
+
+    def reload(self, csv_filename=None):
+        """Re-reads the CSV file and applies only the rows that were added, changed or removed."""
+        self._check_writable()
+        csv_filename = csv_filename or self.csv_filename
+        self.csv_filename = csv_filename
+        seen = set()
+        changed = []
+        for chunk in read_chunks(read_rows(csv_filename), self.chunk_size):
+            for row in chunk:
+                seen.add(normalize_key(row[0]))
+                current = self.binary_search(row[0])
+                if current is None or row != (current.country, current.capital, current.continent,
+                                              current.population, current.language):
+                    changed.append(row)
+        removed = [key for key in self.key_index.keys if key not in seen]
+        for key in removed:
+            self._remove(key)
+        self.append_rows(changed)
+
+    def _row(self, i):
+        if self.snapshot is not None:
+            return self.snapshot.row(i)
+        return self.store.row(i) if self.columnar else self.countries[i]
+
+    def _name_at(self, pos):
+        """Name of the country at position pos of the sorted key order."""
+        if self.snapshot is not None:
+            return self.snapshot.name(pos)
+        if self.columnar:
+            return self.store.names[self.key_index.rows[pos]]
+        return self.countries[pos].country
+
+    def columns(self):
+        """Returns the columnar store, building it from the loaded objects (or snapshot) the first time."""
+        if self.store is None:
+            self.store = ColumnarCountryStore(self.iter_rows())
+        return self.store
 
     def binary_search(self, target_country):
-        """Performs a binary search for the target country in the sorted list."""
+        """Performs a binary search for the target country over the precomputed key index."""
+        i = self.key_index.find(target_country)
+        return self._row(i) if i >= 0 else None
+
+    def lookup_many(self, country_names):
+        """Looks up many countries at once; returns a CountryInfo or None for each name, in order."""
+        return [self._row(i) if i >= 0 else None for i in self.key_index.find_many(country_names)]
+
+    def binary_search_lowercase(self, target_country):
+        """The original search that lowercases both sides on every probe (kept for benchmarking)."""
         low = 0
-        high = len(self.countries) - 1
+        high = len(self.key_index) - 1
 
         while low <= high:
             mid = (low + high) // 2
-            mid_country = self.countries[mid].country
+            mid_country = self._name_at(mid)
 
             if mid_country.lower() == target_country.lower():
-                return self.countries[mid]
+                return self._row(self.key_index.rows[mid] if self.columnar else mid)
             elif mid_country.lower() < target_country.lower():
                 low = mid + 1
             else:
@@ -57,20 +572,379 @@ class CountryDatabase:
         return None  # Country not found
 
     def search_country(self, country_name):
-        """Searches for the country by name using binary search."""
+        """Searches for the country by name using binary search, prints and returns the result."""
         result = self.binary_search(country_name)
         if result:
             print(result)
         else:
             print(f"Country '{country_name}' not found in the database.")
+            suggestions = self.search_index().search(country_name, k=3)
+            if suggestions:
+                print(f"Did you mean: {', '.join(country.country for country in suggestions)}?")
+        return result
 
+    def search_index(self):
+        """Returns the prefix/fuzzy CountrySearchIndex, building it the first time it is needed."""
+        if self._search_index is None:
+            self._search_index = CountrySearchIndex(self)
+        return self._search_index
 
- 
+    def find_by_capital(self, capital):
+        """Returns the countries whose capital matches (case-insensitive)."""
+        store = self.columns()
+        return store.rows(store.capital_index.lookup(normalize_key(capital)))
+
+    def find_by_continent(self, continent):
+        """Returns the countries on the given continent (case-insensitive)."""
+        store = self.columns()
+        return store.rows(store.continent_index.lookup(normalize_key(continent)))
+
+    def find_by_language(self, language):
+        """Returns the countries that speak the given language (case-insensitive)."""
+        store = self.columns()
+        return store.rows(store.language_index.lookup(normalize_key(language)))
+
+    def population_between(self, low, high):
+        """Returns the countries with low <= population <= high, smallest first. O(log n + k)."""
+        store = self.columns()
+        return store.rows(store.population_index.range(low, high))
+
+    def _filter_rows(self, field, op, value):
+        """Row numbers matching one where() condition, read from the sorted indexes."""
+        store = self.columns()
+        if field == 'population':
+            keys, rows = store.population_index.keys, store.population_index.rows
+            if op == 'gt':
+                return rows[bisect_right(keys, value):]
+            if op == 'gte':
+                return rows[bisect_left(keys, value):]
+            if op == 'lt':
+                return rows[:bisect_left(keys, value)]
+            if op == 'lte':
+                return rows[:bisect_right(keys, value)]
+            index = store.population_index
+        elif field == 'country':
+            if op == 'eq':
+                row = store.key_index.find(value)
+                return [row] if row >= 0 else []
+            if op == 'in':
+                return [row for row in store.key_index.find_many(value) if row >= 0]
+            index = None
+        elif field in ('capital', 'continent', 'language'):
+            index = getattr(store, f"{field}_index")
+            if op == 'eq':
+                value = normalize_key(value)
+            elif op == 'in':
+                value = [normalize_key(v) for v in value]
+        else:
+            raise ValueError(f"Unknown field '{field}'.")
+        if op == 'eq' and index is not None:
+            return index.lookup(value)
+        if op == 'in' and index is not None:
+            return [row for v in value for row in index.lookup(v)]
+        raise ValueError(f"Unsupported filter '{field}__{op}'.")
+
+    def where(self, **filters):
+        """Returns the countries matching every filter, e.g. where(population__gt=10**7, continent='Asia').
+
+        Filters are field__op=value with op one of eq (the default), in, gt, gte,
+        lt and lte; gt/gte/lt/lte only apply to population. Each filter is a
+        range read from a sorted index, so no rows are scanned.
+        """
+        return self.columns().rows(self._where_rows(filters))
+
+    def _where_rows(self, filters):
+        rows = None
+        for name, value in filters.items():
+            field, _, op = name.partition('__')
+            matched = self._filter_rows(field, op or 'eq', value)
+            if rows is None:
+                rows = list(dict.fromkeys(matched))
+            else:
+                matched = set(matched)
+                rows = [row for row in rows if row in matched]
+        if rows is None:
+            rows = list(self.columns().key_index.rows)
+        return rows
+
+    def aggregate(self, group_by='continent', metrics=('count', 'sum', 'mean'), top=0, where=None):
+        """Population statistics per group, e.g. aggregate(group_by='language', metrics=('sum', 'max'), top=3).
+
+        group_by is continent, language or capital; metrics are any of count,
+        sum, mean, min and max. top adds the names of the most populous
+        countries of each group. where takes the same filters as where().
+        Results are cached until the data is reloaded.
+        """
+        filters = tuple(sorted(
+            (name, tuple(value) if isinstance(value, (list, set)) else value) for name, value in (where or {}).items()
+        ))
+        cache_key = (group_by, tuple(metrics), top, filters)
+        if cache_key in self._aggregate_cache:
+            return self._aggregate_cache[cache_key]
+
+        if group_by not in ('continent', 'language', 'capital'):
+            raise ValueError(f"Cannot group by '{group_by}'.")
+        store = self.columns()
+        index = getattr(store, f"{group_by}_index")
+        allowed = set(self._where_rows(where)) if where else None
+        populations = store.populations
+        keys, index_rows = index.keys, index.rows
+
+        result = {}
+        start = 0
+        # Rows of the same group are next to each other in the index, so each
+        # group is one slice that the builtins reduce without a Python loop
+        while start < len(keys):
+            end = bisect_right(keys, keys[start], start)
+            rows = index_rows[start:end]
+            if allowed is not None:
+                rows = [row for row in rows if row in allowed]
+            if rows:
+                values = array('q', map(populations.__getitem__, rows))
+                stats = {}
+                for metric in metrics:
+                    if metric == 'count':
+                        stats[metric] = len(values)
+                    elif metric == 'sum':
+                        stats[metric] = sum(values)
+                    elif metric == 'mean':
+                        stats[metric] = sum(values) / len(values)
+                    elif metric == 'min':
+                        stats[metric] = min(values)
+                    elif metric == 'max':
+                        stats[metric] = max(values)
+                    else:
+                        raise ValueError(f"Unknown metric '{metric}'.")
+                if top:
+                    stats['top'] = [store.names[row] for row in heapq.nlargest(top, rows, key=populations.__getitem__)]
+                result[self._group_name(store, group_by, keys[start], rows[0])] = stats
+            start = end
+        self._aggregate_cache[cache_key] = result
+        return result
+
+    @staticmethod
+    def _group_name(store, group_by, key, row):
+        """Original spelling of a group key, taken from one of its rows."""
+        if group_by == 'language':
+            for language in store.languages[row].split('/'):
+                if normalize_key(language.strip()) == key:
+                    return language.strip()
+        return store.continents[row] if group_by == 'continent' else store.capitals[row]
+
+
+def edit_distance(a, b, limit=None):
+    """Levenshtein distance between two strings; with a limit, anything above it comes back as limit + 1.
+
+    With a limit only the diagonal band of width 2 * limit + 1 is computed.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is None:
+        limit = len(a)
+    too_far = limit + 1
+    if len(a) - len(b) > limit:
+        return too_far
+    previous = [j if j <= limit else too_far for j in range(len(b) + 1)]
+    for i, char_a in enumerate(a, 1):
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [too_far] * (len(b) + 1)
+        current[0] = i if i <= limit else too_far
+        for j in range(low, high + 1):
+            distance = previous[j - 1] + (char_a != b[j - 1])
+            if previous[j] < distance:
+                distance = previous[j] + 1
+            if current[j - 1] < distance:
+                distance = current[j - 1] + 1
+            current[j] = distance
+        if min(current[low - 1:high + 1]) > limit:
+            return too_far  # Every alignment is already over the limit
+        previous = current
+    return min(previous[-1], too_far)
+
+
+def trigrams(key):
+    """(position, trigram) of every three-character run of key, padded with a space at each end."""
+    padded = ' ' + key + ' '
+    return [(i, padded[i:i + 3]) for i in range(len(padded) - 2)]
+
+
+# Node of the compressed (radix) trie: each edge carries a whole run of characters
+class _TrieNode:
+    __slots__ = ('edges', 'entries', 'top')
+
+    def __init__(self):
+        self.edges = {}  # first character of the edge label -> [label, child]
+        self.entries = []  # (rank, name) of the countries whose key ends here
+        self.top = []  # best ranked entries of the whole subtree, precomputed
+
+
+# Prefix autocomplete and typo-tolerant lookup over the country names.
+# Results are ranked by population (largest first) so the likely country wins.
+# One edit changes at most three trigrams and shifts the others by at most
+# one place, so fuzzy() only measures the edit distance of names that share
+# enough trigrams with the query near the same positions and have a close
+# enough length; the rest of the table is never touched.
+class CountrySearchIndex:
+    def __init__(self, database, top_k=10):
+        self.top_k = top_k
+        self.root = _TrieNode()
+        self.database = database
+        self.keys = []  # Entry id -> normalized name
+        self.entries = []  # Entry id -> (rank, name)
+        ids = defaultdict(list)  # Trigram -> ids of the entries containing it
+        positions = defaultdict(list)  # Trigram -> where it sits in each of those entries
+        for country, capital, continent, population, language in database.iter_rows():
+            key = normalize_key(country)
+            entry = (-population, country)
+            self._trie_insert(key, entry)
+            entry_id = len(self.keys)
+            self.keys.append(key)
+            self.entries.append(entry)
+            for position, gram in trigrams(key):
+                ids[gram].append(entry_id)
+                positions[gram].append(position)
+        # Trigram -> (entry ids, positions of the trigram in them), packed into arrays
+        self.postings = {gram: (array('l', ids[gram]), array('H', positions[gram])) for gram in ids}
+        self._collect_top(self.root)
+
+    def _trie_insert(self, key, entry):
+        node = self.root
+        while key:
+            edge = node.edges.get(key[0])
+            if edge is None:
+                child = _TrieNode()
+                node.edges[key[0]] = [key, child]
+                node = child
+                break
+            label, child = edge
+            common = 0
+            while common < min(len(label), len(key)) and label[common] == key[common]:
+                common += 1
+            if common < len(label):
+                # Split the edge where the new key leaves it
+                middle = _TrieNode()
+                middle.edges[label[common]] = [label[common:], child]
+                edge[0] = label[:common]
+                edge[1] = middle
+                child = middle
+            node = child
+            key = key[common:]
+        node.entries.append(entry)
+
+    def _collect_top(self, node):
+        candidates = list(node.entries)
+        for label, child in node.edges.values():
+            candidates.extend(self._collect_top(child))
+        node.top = heapq.nsmallest(self.top_k, candidates)
+        return node.top
+
+    def complete(self, prefix, k=None):
+        """Returns the names of the top k countries whose name starts with prefix."""
+        k = k or self.top_k
+        node = self.root
+        key = normalize_key(prefix)
+        while key:
+            edge = node.edges.get(key[0])
+            if edge is None:
+                return []
+            label, child = edge
+            if key.startswith(label):
+                key = key[len(label):]
+            elif not label.startswith(key):
+                return []
+            else:
+                key = ''
+            node = child
+        return [name for rank, name in node.top[:k]]
+
+    def fuzzy(self, name, max_distance=2, k=None):
+        """Returns the names of the top k countries within max_distance edits of name, closest first.
+
+        Names that share no trigram with name are never suggested.
+        """
+        k = k or self.top_k
+        key = normalize_key(name)
+        grams = trigrams(key)
+        needed = max(1, len(grams) - 3 * max_distance)
+        shared = {}
+        for position, gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                continue
+            low, high = position - max_distance, position + max_distance
+            for entry_id, entry_position in zip(*posting):
+                if low <= entry_position <= high:
+                    shared[entry_id] = shared.get(entry_id, 0) + 1
+        keys, entries = self.keys, self.entries
+        shortest, longest = len(key) - max_distance, len(key) + max_distance
+        matches = []
+        for entry_id, count in shared.items():
+            if count < needed or not shortest <= len(keys[entry_id]) <= longest:
+                continue
+            distance = edit_distance(key, keys[entry_id], max_distance)
+            if distance <= max_distance:
+                rank, country = entries[entry_id]
+                matches.append((distance, rank, country))
+        return [country for distance, rank, country in heapq.nsmallest(k, matches)]
+
+    def search(self, query, k=None, max_distance=2):
+        """Ranked suggestions for query: prefix matches first, then close misspellings."""
+        k = k or self.top_k
+        names = self.complete(query, k)
+        if len(names) < k:
+            for name in self.fuzzy(query, max_distance, k):
+                if name not in names:
+                    names.append(name)
+        return [self.database.binary_search(name) for name in names[:k]]  # k binary searches
+
+
+def benchmark_lookups(database, country_names, repeat=5):
+    """Times the per-probe lowercase search against the key index and the batched lookup.
+
+    Returns the best time in seconds for each path over the full list of names.
+    """
+    return {
+        'binary_search_lowercase': best_time(lambda: [database.binary_search_lowercase(name) for name in country_names], repeat),
+        'binary_search': best_time(lambda: [database.binary_search(name) for name in country_names], repeat),
+        'lookup_many': best_time(lambda: database.lookup_many(country_names), repeat),
+    }
+
+
+# The countries1.csv that ships next to this file
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'countries1.csv')
+_databases = {}
+
+
+def get_database(csv_filename=DEFAULT_CSV, columnar=False):
+    """Shared CountryDatabase for csv_filename, loaded on first use so importing this module reads nothing."""
+    key = (os.path.abspath(csv_filename), columnar)
+    database = _databases.get(key)
+    if database is None:
+        database = _databases[key] = CountryDatabase(csv_filename, columnar=columnar)
+    return database
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Look up countries by name.")
+    parser.add_argument('countries', nargs='*', default=['Colombia'], help="Country names to search for")
+    parser.add_argument('--csv', default=DEFAULT_CSV, help="Country CSV file (default: countries1.csv next to this file)")
+    parser.add_argument('--columnar', action='store_true', help="Keep the data in columns instead of objects")
+    parser.add_argument('--benchmark', action='store_true', help="Time the lookup paths")
+    args = parser.parse_args(argv)
 
-# Usage Example
-if __name__ == "__main__":
     # Create a CountryDatabase from a CSV file
-    database = CountryDatabase('/Users/vincentdo/Downloads/countries1.csv')
-    
+    database = get_database(args.csv, args.columnar)
+
     # Search for a country by name
-    database.search_country('Colombia') 
+    for name in args.countries:
+        database.search_country(name)
+
+    if args.benchmark:
+        names = [row[0] for row in database.iter_rows()] * 1000
+        for path, seconds in benchmark_lookups(database, names).items():
+            print(f"{path}: {seconds * 1000:.2f} ms for {len(names)} lookups")
+
+
+# Usage Example
+if __name__ == "__main__":
+    main()
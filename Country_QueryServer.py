@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from Country_BinarySearch import DEFAULT_CSV, CountryDatabase
+
+
+# Bounded LRU cache whose entries also expire after ttl seconds
+class LRUCache:
+    def __init__(self, capacity=1024, ttl=60.0):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0  # Counted by the owner when a miss really goes to the database
+
+    def get(self, key):
+        """Returns (True, value) on a hit and (False, None) on a miss."""
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+        if entry is not None:
+            del self.entries[key]  # Expired
+        return False, None
+
+    def put(self, key, value):
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+
+# Line protocol over TCP: every request is one line "<command> <argument>" and
+# every response is one line of JSON.
+#   country <name>   exact lookup, returns the country or null
+#   search <text>    prefix/fuzzy suggestions, returns a list of countries
+#   stats            cache and request counters
+class CountryQueryServer:
+    def __init__(self, database, cache_size=1024, ttl=60.0):
+        self.database = database
+        self.cache = LRUCache(cache_size, ttl)
+        self.in_flight = {}  # Query -> future shared by identical concurrent requests
+        self.requests = 0
+        self.coalesced = 0
+        self.server = None
+        self.index_lock = threading.Lock()  # Queries run in executor threads; the search index is built once
+
+    def run_query(self, command, argument):
+        """Runs one query against the database and returns a JSON-ready result."""
+        if command == 'country':
+            result = self.database.binary_search(argument)
+            return result.to_dict() if result else None
+        if command == 'search':
+            return [country.to_dict() for country in self.search_index().search(argument) if country]
+        raise ValueError(f"Unknown command '{command}'.")
+
+    def search_index(self):
+        """The database's search index; the lock keeps concurrent queries from building it twice."""
+        with self.index_lock:
+            return self.database.search_index()
+
+    async def query(self, command, argument):
+        """Answers a query from the cache, an identical in-flight query, or the database."""
+        self.requests += 1
+        key = (command, argument.casefold())
+        hit, value = self.cache.get(key)
+        if hit:
+            return value
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await future
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        self.cache.misses += 1  # Coalesced requests above don't count, only queries that run
+        try:
+            value = await asyncio.get_running_loop().run_in_executor(None, self.run_query, command, argument)
+            self.cache.put(key, value)
+            future.set_result(value)
+            return value
+        except Exception as error:
+            future.set_exception(error)
+            future.exception()  # Mark as retrieved when nobody else is waiting
+            raise
+        finally:
+            del self.in_flight[key]
+            if not future.done():
+                future.cancel()  # This request was cancelled; don't leave the coalesced ones waiting
+
+    def stats(self):
+        return dict(self.cache.stats(), requests=self.requests, coalesced=self.coalesced)
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command, _, argument = line.decode('utf-8').strip().partition(' ')
+                try:
+                    if command == 'stats':
+                        response = {'ok': True, 'result': self.stats()}
+                    else:
+                        response = {'ok': True, 'result': await self.query(command, argument)}
+                except ValueError as error:
+                    response = {'ok': False, 'error': str(error)}
+                except Exception as error:
+                    response = {'ok': False, 'error': f"{type(error).__name__}: {error}"}  # Keep the connection
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionResetError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765):
+        await asyncio.get_running_loop().run_in_executor(None, self.search_index)  # Built before the first request
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server
+
+    def invalidate(self):
+        """Drops cached results, e.g. after the database was reloaded."""
+        self.cache.clear()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run_load(host, port, queries, total=10000, concurrency=32):
+    """Sends total requests over concurrency connections and reports latency and throughput."""
+    latencies = []
+    remaining = [total]
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            line = random.choice(queries) + '\n'
+            start = time.perf_counter()
+            writer.write(line.encode('utf-8'))
+            await writer.drain()
+            await reader.readline()
+            latencies.append(time.perf_counter() - start)
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'qps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def benchmark(database, total=10000, concurrency=32, port=0):
+    """Starts a server on localhost, runs the load generator against it and returns the report."""
+    server = CountryQueryServer(database)
+    tcp_server = await server.start('127.0.0.1', port)
+    port = tcp_server.sockets[0].getsockname()[1]
+    names = [row[0] for row in database.iter_rows()]
+    queries = [f"country {name}" for name in names] + [f"search {name[:3]}" for name in names]
+    report = await run_load('127.0.0.1', port, queries, total, concurrency)
+    report.update(server.stats())
+    tcp_server.close()
+    await tcp_server.wait_closed()
+    return report
+
+
+async def serve(database, host, port):
+    server = CountryQueryServer(database)
+    tcp_server = await server.start(host, port)
+    print(f"Serving country queries on {host}:{port}")
+    async with tcp_server:
+        await tcp_server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Async line-protocol server for country lookups.")
+    parser.add_argument('csv_filename', nargs='?', default=DEFAULT_CSV)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--benchmark', action='store_true', help="run the load generator instead of serving")
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+
+    database = CountryDatabase(args.csv_filename)
+    if args.benchmark:
+        report = asyncio.run(benchmark(database, args.requests, args.concurrency))
+        print(f"{report['requests']} requests, {report['qps']:.0f} QPS, "
+              f"p50 {report['p50_ms']:.3f} ms, p99 {report['p99_ms']:.3f} ms, "
+              f"cache hits {report['hits']}, misses {report['misses']}, coalesced {report['coalesced']}")
+    else:
+        asyncio.run(serve(database, args.host, args.port))
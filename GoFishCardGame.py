@@ -1,8 +1,14 @@
+import argparse
 import random
-from collections import defaultdict
+import time
+from collections import OrderedDict, defaultdict
+
+from labtools import time_variants
 
 # Define the Card class
 class Card:
+    __slots__ = ('rank', 'suit')
+
     def __init__(self, rank, suit):
         self.rank = rank
         self.suit = suit
@@ -11,21 +17,48 @@ class Card:
         return f"{self.rank} of {self.suit}"
 
 # Define the Deck class
+# The deck is a buffer of card ids (suit * 13 + rank) into the shared CARDS
+# table. Drawing moves a cursor down the buffer and reshuffle() reuses it, so
+# a game allocates no cards at all.
 class Deck:
     suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
     ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-    
-    def __init__(self):
-        self.cards = [Card(rank, suit) for suit in self.suits for rank in self.ranks]
-        random.shuffle(self.cards)
+    sorted_ids = bytes(range(52))
+
+    def __init__(self, rng=random):
+        """rng=None leaves the deck empty until reshuffle() is called."""
+        self.order = bytearray(self.sorted_ids)
+        self.remaining = 0
+        if rng is not None:
+            self.reshuffle(rng)
+
+    def reshuffle(self, rng=random):
+        """Puts all 52 cards back and shuffles them in place (Fisher-Yates, via rng.shuffle)."""
+        self.order[:] = self.sorted_ids  # Same starting order every time, so a seed always deals the same game
+        rng.shuffle(self.order)
+        self.remaining = 52
+
+    def __len__(self):
+        return self.remaining
+
+    @property
+    def cards(self):
+        """Cards still in the deck (the last one is drawn next)."""
+        return [CARDS[card_id] for card_id in self.order[:self.remaining]]
 
     def draw(self):
-        if len(self.cards) > 0:
-            return self.cards.pop()
+        if self.remaining > 0:
+            self.remaining -= 1
+            return CARDS[self.order[self.remaining]]
         return None  # If the deck is empty
 
-# Define the Player class
-class Player:
+
+# Flyweight table: the only 52 Card objects a game ever uses, indexed by card id
+CARDS = tuple(Card(rank, suit) for suit in Deck.suits for rank in Deck.ranks)
+
+# The original list-based player: the hand is re-sorted on every draw.
+# GoFishGame uses Player below; this one is kept as the benchmark baseline.
+class ListPlayer:
     rank_order = {'2': 0, '3': 1, '4': 2, '5': 3, '6': 4, '7': 5, '8': 6, '9': 7, '10': 8, 'J': 9, 'Q': 10, 'K': 11, 'A': 12}
     
     def __init__(self, name):
@@ -59,6 +92,13 @@ class Player:
                 self.hand = [card for card in self.hand if card.rank != rank]
                 print(f"{self.name} has completed a book of {rank}s!")
 
+    def rank_counts(self):
+        """Number of cards held of each rank, in rank order (the view policies get)."""
+        counts = [0] * 13
+        for card in self.hand:
+            counts[self.rank_order[card.rank]] += 1
+        return counts
+
     def show_hand(self):
         return ', '.join(str(card) for card in self.hand)
 
@@ -73,52 +113,202 @@ class Player:
             cards[j + 1] = key_card
         return cards
 
+# Hand as a multiset bucketed by rank: every operation on a rank is O(1) and
+# iterating the buckets in rank order gives the same order insertion sort did
+class RankHand:
+    rank_order = {rank: i for i, rank in enumerate(Deck.ranks)}
+
+    def __init__(self):
+        self.buckets = [[] for _ in Deck.ranks]
+        self.size = 0
+        self.full_ranks = set()  # Ranks holding all 4 cards, waiting to be booked
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for bucket in self.buckets:
+            yield from bucket
+
+    def add(self, card):
+        rank = self.rank_order[card.rank]
+        bucket = self.buckets[rank]
+        bucket.append(card)
+        self.size += 1
+        if len(bucket) == 4:
+            self.full_ranks.add(rank)
+
+    def extend(self, cards):
+        for card in cards:
+            self.add(card)
+
+    def count(self, rank):
+        """Number of cards of rank (0 for anything that is not a rank)."""
+        index = self.rank_order.get(rank)
+        return 0 if index is None else len(self.buckets[index])
+
+    def remove_rank(self, rank):
+        """Removes and returns every card of rank."""
+        index = self.rank_order.get(rank)
+        if index is None:
+            return []
+        cards = self.buckets[index]
+        self.buckets[index] = []
+        self.size -= len(cards)
+        self.full_ranks.discard(index)
+        return cards
+
+    def take_books(self):
+        """Removes every complete rank and returns those ranks, lowest first."""
+        books = [Deck.ranks[index] for index in sorted(self.full_ranks)]
+        for rank in books:
+            self.remove_rank(rank)
+        return books
+
+    def counts(self):
+        return [len(bucket) for bucket in self.buckets]
+
+
+# Define the Player class
+class Player:
+    def __init__(self, name):
+        self.name = name
+        self.hand = RankHand()
+        self.books = 0  # Track the number of sets of 4 a player has
+
+    def draw_card(self, deck):
+        card = deck.draw()
+        if card:
+            self.hand.add(card)  # The hand stays in rank order without sorting
+        return card
+
+    def remove_cards_by_rank(self, rank):
+        return self.hand.remove_rank(rank)
+
+    def has_rank(self, rank):
+        return self.hand.count(rank) > 0
+
+    def check_for_books(self):
+        """Books every complete rank and returns those ranks."""
+        books = self.hand.take_books()
+        self.books += len(books)
+        return books
+
+    def rank_counts(self):
+        """Number of cards held of each rank, in rank order (the view policies get)."""
+        return self.hand.counts()
+
+    def show_hand(self):
+        return ', '.join(str(card) for card in self.hand)
+
+# Game events. Both engines pass them to observers as
+# observe(event, player, other, value, count):
+#   DEAL      player was dealt card id value
+#   ASK       player asked other for rank index value
+#   TRANSFER  other gave player count cards of rank index value
+#   FISH      player drew card id value from the deck
+#   BOOK      player completed a book of rank index value
+# Card ids are private: an observer playing a seat should only look at its own.
+DEAL, ASK, TRANSFER, FISH, BOOK = range(5)
+CARD_IDS = {card: card_id for card_id, card in enumerate(CARDS)}
+
+
 # Define the Game class
 class GoFishGame:
-    def __init__(self, players):
+    def __init__(self, players, policies=None, rng=None, listeners=None, seed=None, log=None, quiet=False):
+        """policies optionally gives one policy per player (None means ask via input()).
+
+        Policies with an observe() method, and every listener, are told about
+        each game event. The game is dealt from rng, or from a fresh RNG seeded
+        with seed. log (an EventLog) records the game so it can be replayed,
+        which needs the seed. quiet turns off all printing.
+        """
+        if log is not None and seed is None:
+            if rng is not None:
+                raise ValueError("A logged game needs its seed, pass seed instead of rng.")
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self.rng = rng or random.Random(seed)
+        self.log = log
+        self.quiet = quiet
         self.players = [Player(name) for name in players]
-        self.deck = Deck()
+        self.policies = policies or [None] * len(self.players)
+        self.deck = Deck(self.rng)
         self.current_player_index = 0
+        self.observers = [policy.observe for policy in self.policies if hasattr(policy, 'observe')]
+        self.observers += [listener.observe for listener in listeners or []]
+        if log is not None:
+            self.observers.append(log.observe)
+        for seat, policy in enumerate(self.policies):
+            if hasattr(policy, 'start_game'):
+                policy.start_game(seat, len(self.players))
+
+    def say(self, message):
+        if not self.quiet:
+            print(message)
+
+    def emit(self, event, player, other=-1, value=0, count=0):
+        for observe in self.observers:
+            observe(event, player, other, value, count)
 
     def deal(self):
         cards_per_player = 7 if len(self.players) <= 3 else 5
         for _ in range(cards_per_player):
-            for player in self.players:
-                player.draw_card(self.deck)
+            for i, player in enumerate(self.players):
+                card = player.draw_card(self.deck)
+                if card:
+                    self.emit(DEAL, i, value=CARD_IDS[card])
+
+    def check_for_books(self, player):
+        for rank in player.check_for_books():
+            self.say(f"{player.name} has completed a book of {rank}s!")
+            self.emit(BOOK, self.players.index(player), value=RankHand.rank_order[rank])
 
     def go_fish(self, player):
-        print(f"{player.name} is going fishing...")
-        player.draw_card(self.deck)
-        player.check_for_books()
+        self.say(f"{player.name} is going fishing...")
+        card = player.draw_card(self.deck)
+        if card:
+            self.emit(FISH, self.players.index(player), value=CARD_IDS[card])
+        self.check_for_books(player)
 
     def play_turn(self, player):
-        print(f"\n{player.name}'s turn.")
-        print(f"Current hand: {player.show_hand()}")
+        self.say(f"\n{player.name}'s turn.")
+        self.say(f"Current hand: {player.show_hand()}")
 
         # Ask for a rank from the next player
         opponent = self.players[(self.current_player_index + 1) % len(self.players)]
-        print(f"Choose a rank to ask {opponent.name} for: ")
-        rank = input(f"{player.name}, enter a rank (2-A): ").upper()
+        policy = self.policies[self.current_player_index]
+        if policy is None:
+            print(f"Choose a rank to ask {opponent.name} for: ")
+            rank = input(f"{player.name}, enter a rank (2-A): ").upper()
+        else:
+            rank = Deck.ranks[policy(player.rank_counts(), self.rng)]
+            self.say(f"{player.name} asks {opponent.name} for {rank}.")
+        player_index = self.current_player_index
+        opponent_index = (player_index + 1) % len(self.players)
+        self.emit(ASK, player_index, opponent_index, RankHand.rank_order.get(rank, -1))
 
         if opponent.has_rank(rank):
-            print(f"{opponent.name} has {rank}!")
+            self.say(f"{opponent.name} has {rank}!")
             cards = opponent.remove_cards_by_rank(rank)
             player.hand.extend(cards)
-            player.hand = player.insertion_sort(player.hand)  # Sort hand after receiving cards
+            self.emit(TRANSFER, player_index, opponent_index, RankHand.rank_order[rank], len(cards))
         else:
-            print(f"{opponent.name} does not have {rank}. Go Fish!")
+            self.say(f"{opponent.name} does not have {rank}. Go Fish!")
             self.go_fish(player)
 
-        player.check_for_books()
+        self.check_for_books(player)
 
     def check_game_end(self):
-        return len(self.deck.cards) == 0 or all(player.hand == [] for player in self.players)
+        return len(self.deck) == 0 or all(not player.hand for player in self.players)
 
     def display_books(self):
         for player in self.players:
-            print(f"{player.name} has {player.books} books.")
+            self.say(f"{player.name} has {player.books} books.")
 
     def play_game(self):
+        if self.log is not None:
+            self.log.begin_game(self.seed, len(self.players))
         self.deal()
 
         while not self.check_game_end():
@@ -128,15 +318,380 @@ class GoFishGame:
             # Move to the next player
             self.current_player_index = (self.current_player_index + 1) % len(self.players)
 
-        print("\nGame over!")
+        self.say("\nGame over!")
         self.display_books()
         winner = max(self.players, key=lambda player: player.books)
-        print(f"The winner is {winner.name} with {winner.books} books!")
+        self.say(f"The winner is {winner.name} with {winner.books} books!")
+        if self.log is not None:
+            self.log.end_game([player.books for player in self.players])
+        return winner
+
+
+# Policies pick the rank to ask for. They get the player's hand as 13 rank
+# counts (index 0 is '2', index 12 is 'A') and the game's RNG, and return a
+# rank index. The same policy works in GoFishGame and in the headless engine.
+def random_policy(counts, rng):
+    """Asks for a random rank from the hand."""
+    held = [rank for rank in range(13) if counts[rank]]
+    return rng.choice(held) if held else rng.randrange(13)
+
+
+def most_cards_policy(counts, rng):
+    """Asks for the rank the player holds the most of."""
+    return counts.index(max(counts))
+
+
+# Built-in AI. It follows the game through its events to learn what the
+# others must be holding (ranks they asked for, cards they received, asks
+# they could not answer), then scores each rank it could ask for by playing
+# the game forward from random deals consistent with what it knows
+# (determinized Monte Carlo). Scores are kept in a bounded transposition table
+# keyed by a Zobrist hash of the information state, so a position seen again
+# starts from the rollouts already done.
+class InformationSetAI:
+    def __init__(self, time_budget=0.005, max_rollouts=200, rollout_depth=30, table_size=50000, rollouts_per_move=None):
+        """rollouts_per_move replaces the time budget with a fixed amount of work, so seeded games are reproducible.
+
+        All randomness comes from the rng the game passes in.
+        """
+        self.time_budget = time_budget  # Seconds per move
+        self.rollouts_per_move = rollouts_per_move
+        self.max_rollouts = max_rollouts  # Rollouts per information state, after that the table answers
+        self.rollout_depth = rollout_depth  # Turns played forward in each rollout
+        self.table_size = table_size
+        self.table = OrderedDict()  # Zobrist hash -> {rank: [total score, rollouts]}
+        zobrist_rng = random.Random(0x60F154)
+        self.zobrist_counts = [[[zobrist_rng.getrandbits(64) for _ in range(53)] for _ in range(13)] for _ in range(3)]
+        self.zobrist_sizes = [[zobrist_rng.getrandbits(64) for _ in range(53)] for _ in range(2)]
+        self.start_game(0, 2)
+
+    def start_game(self, seat, num_players):
+        self.seat = seat
+        self.num_players = num_players
+        self.sizes = [0] * num_players  # Cards in each hand
+        self.known = [[0] * 13 for _ in range(num_players)]  # Cards each player is known to hold at least
+        self.lacks = [[False] * 13 for _ in range(num_players)]  # Ranks a player is known not to hold
+        self.books = [0] * num_players
+        self.booked = [False] * 13
+        self.deck_size = 52
+        self.pending_ask = None
+
+    def observe(self, event, player, other, value, count):
+        if event == DEAL:
+            self.sizes[player] += 1
+            self.deck_size -= 1
+        elif event == ASK:
+            if value >= 0:
+                self.known[player][value] = max(self.known[player][value], 1)
+                self.lacks[player][value] = False
+                self.pending_ask = (player, other, value)
+        elif event == TRANSFER:
+            self.pending_ask = None
+            self.sizes[player] += count
+            self.sizes[other] -= count
+            self.known[player][value] += count
+            self.known[other][value] = 0
+            self.lacks[other][value] = True
+        elif event == FISH:
+            if self.pending_ask is not None:
+                asker, target, rank = self.pending_ask
+                self.lacks[target][rank] = True
+                self.pending_ask = None
+            self.sizes[player] += 1
+            self.deck_size -= 1
+            self.lacks[player] = [False] * 13  # The drawn card could be anything
+        elif event == BOOK:
+            self.sizes[player] -= 4
+            self.books[player] += 1
+            self.booked[value] = True
+            for known in self.known:
+                known[value] = 0
+
+    def state_hash(self, counts):
+        target = (self.seat + 1) % self.num_players
+        h = self.zobrist_sizes[0][min(self.sizes[target], 52)] ^ self.zobrist_sizes[1][self.deck_size]
+        for rank in range(13):
+            h ^= self.zobrist_counts[0][rank][counts[rank]]
+            h ^= self.zobrist_counts[1][rank][min(self.known[target][rank], 52)]
+            h ^= self.zobrist_counts[2][rank][self.lacks[target][rank]]
+        return h ^ ((self.books[self.seat] - max(self.books)) & 0xFFFF)
+
+    def determinize(self, counts, rng):
+        """Deals the unseen cards at random in a way that fits everything observed."""
+        pool = []
+        for rank in range(13):
+            if not self.booked[rank]:
+                unseen = 4 - counts[rank] - sum(known[rank] for p, known in enumerate(self.known) if p != self.seat)
+                pool.extend([rank] * max(unseen, 0))
+        rng.shuffle(pool)
+
+        hands = []
+        for player in range(self.num_players):
+            if player == self.seat:
+                hands.append(list(counts))
+                continue
+            hand = list(self.known[player])
+            free = max(self.sizes[player] - sum(hand), 0)
+            kept = []
+            while free and pool:
+                rank = pool.pop()
+                if self.lacks[player][rank] and any(not self.lacks[player][r] for r in pool):
+                    kept.append(rank)  # Leave it for someone who may hold it
+                    continue
+                hand[rank] += 1
+                free -= 1
+            pool.extend(kept)
+            hands.append(hand)
+        rng.shuffle(pool)
+        return hands, pool  # What is left of the pool is the deck
+
+    def rollout(self, counts, first_rank, rng):
+        """Plays one determinized game forward, asking for first_rank now, and returns the book margin."""
+        hands, deck = self.determinize(counts, rng)
+        books = list(self.books)
+        num_players = self.num_players
+        current = self.seat
+        rank = first_rank
+        for _ in range(self.rollout_depth):
+            if not deck:
+                break
+            hand = hands[current]
+            opponent = hands[(current + 1) % num_players]
+            if opponent[rank]:
+                hand[rank] += opponent[rank]
+                opponent[rank] = 0
+            else:
+                hand[deck.pop()] += 1
+            if 4 in hand:
+                for r in range(13):
+                    if hand[r] >= 4:
+                        hand[r] = 0
+                        books[current] += 1
+            current = (current + 1) % num_players
+            hand = hands[current]
+            rank = hand.index(max(hand))  # Everyone plays most_cards_policy in the rollout
+        return books[self.seat] - max(b for p, b in enumerate(books) if p != self.seat)
+
+    def __call__(self, counts, rng):
+        candidates = [rank for rank in range(13) if counts[rank]]
+        if not candidates:
+            return rng.randrange(13)
+        if len(candidates) == 1:
+            return candidates[0]
+
+        key = self.state_hash(counts)
+        stats = self.table.get(key)
+        if stats is None:
+            stats = {rank: [0.0, 0] for rank in candidates}
+            self.table[key] = stats
+            if len(self.table) > self.table_size:
+                self.table.popitem(last=False)
+        else:
+            self.table.move_to_end(key)
+
+        done = sum(visits for total, visits in stats.values())
+        if self.rollouts_per_move is None:
+            deadline = time.perf_counter() + self.time_budget
+            limit = self.max_rollouts
+        else:
+            deadline = None
+            limit = min(self.max_rollouts, done + self.rollouts_per_move)
+        while done < limit:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break  # Checked before every rollout, so a move overruns the budget by one rollout at most
+            rank = candidates[done % len(candidates)]  # Round robin, carried over from earlier visits
+            stats[rank][0] += self.rollout(counts, rank, rng)
+            stats[rank][1] += 1
+            done += 1
+        return max(candidates, key=lambda rank: stats[rank][0] / stats[rank][1] if stats[rank][1] else 0.0)
+
+
+# Policies by name, so they can be picked on the command line or sent to worker processes.
+# Classes are instantiated once per seat.
+POLICIES = {
+    'random': random_policy,
+    'most_cards': most_cards_policy,
+    'ai': InformationSetAI,
+}
+# Options that make a policy class independent of the clock, for seeded batches and tournaments
+REPRODUCIBLE_OPTIONS = {
+    'ai': {'rollouts_per_move': 64},  # About what the default 5 ms budget allows
+}
+
+
+def make_policy(name, reproducible=False):
+    """Returns a ready-to-use policy from POLICIES; reproducible ones play the same for the same seed."""
+    policy = POLICIES[name]
+    if not isinstance(policy, type):
+        return policy
+    return policy(**REPRODUCIBLE_OPTIONS.get(name, {})) if reproducible else policy()
+
+
+# Headless engine: same rules as GoFishGame, but every hand is a list of 13
+# rank counts and cards are ints 0-51 (suit * 13 + rank), in the same order
+# Deck builds them. Nothing is printed, so batches of games run fast.
+def play_headless_game(policies, rng, deck=None, listeners=()):
+    """Plays one game and returns the number of books of each player.
+
+    Given the same policies and an RNG in the same state, the books match
+    what GoFishGame.play_game produces. deck is an optional Deck to reshuffle
+    and reuse instead of building a new one. Observing policies and listeners
+    get the same events GoFishGame emits.
+    """
+    num_players = len(policies)
+    if deck is None:
+        deck = Deck(rng)
+    else:
+        deck.reshuffle(rng)
+    order = deck.order
+    remaining = 52
+    hands = [[0] * 13 for _ in range(num_players)]
+    books = [0] * num_players
+    observers = [policy.observe for policy in policies if hasattr(policy, 'observe')]
+    observers += [listener.observe for listener in listeners]
+    for seat, policy in enumerate(policies):
+        if hasattr(policy, 'start_game'):
+            policy.start_game(seat, num_players)
+
+    cards_per_player = 7 if num_players <= 3 else 5
+    for _ in range(cards_per_player):
+        for player, hand in enumerate(hands):
+            if remaining:
+                remaining -= 1
+                hand[order[remaining] % 13] += 1
+                for observe in observers:
+                    observe(DEAL, player, -1, order[remaining], 0)
+    cards_in_hands = 52 - remaining  # Asks only move cards between hands, so a counter is enough
+
+    current = 0
+    while remaining and cards_in_hands:
+        hand = hands[current]
+        target = (current + 1) % num_players
+        opponent = hands[target]
+        rank = policies[current](hand, rng)
+        for observe in observers:
+            observe(ASK, current, target, rank, 0)
+        if opponent[rank]:
+            count = opponent[rank]
+            hand[rank] += count
+            opponent[rank] = 0
+            for observe in observers:
+                observe(TRANSFER, current, target, rank, count)
+        else:
+            remaining -= 1  # Go fish (the loop guarantees the deck is not empty)
+            hand[order[remaining] % 13] += 1
+            cards_in_hands += 1
+            for observe in observers:
+                observe(FISH, current, -1, order[remaining], 0)
+        # Books are checked over the whole hand, as dealt hands are never checked
+        if 4 in hand:
+            for r in range(13):
+                if hand[r] == 4:
+                    hand[r] = 0
+                    books[current] += 1
+                    cards_in_hands -= 4
+                    for observe in observers:
+                        observe(BOOK, current, -1, r, 0)
+        current = (current + 1) % num_players
+    deck.remaining = remaining
+    return books
+
+
+def run_headless_games(num_games, policies, seed=None, log=None):
+    """Plays num_games games and returns the wins and books of each player.
+
+    Every game gets its own 64-bit seed drawn from seed, so any single game
+    can be replayed on its own. log (an EventLog) records every game.
+    """
+    seeds = random.Random(seed)
+    rng = random.Random()
+    deck = Deck(None)  # One buffer for the whole batch, reshuffled for every game
+    listeners = [log] if log is not None else []
+    wins = [0] * len(policies)
+    total_books = [0] * len(policies)
+    for _ in range(num_games):
+        game_seed = seeds.getrandbits(64)
+        rng.seed(game_seed)
+        if log is not None:
+            log.begin_game(game_seed, len(policies))
+        books = play_headless_game(policies, rng, deck, listeners)
+        if log is not None:
+            log.end_game(books)
+        wins[books.index(max(books))] += 1  # Ties go to the first player, like max() in play_game
+        for i, count in enumerate(books):
+            total_books[i] += count
+    return {'games': num_games, 'wins': wins, 'books': total_books}
+
+# Micro-benchmarks: Player (RankHand) against the original ListPlayer
+class _ListDeck:
+    """Deck stand-in that deals a fixed list of cards, so both players see the same draws."""
+    def __init__(self, cards):
+        self.cards = list(cards)
+
+    def draw(self):
+        return self.cards.pop() if self.cards else None
+
+
+def benchmark_hands(num_decks=4, repeat=5, seed=0):
+    """Times the hand operations of ListPlayer and Player on hands drawn from num_decks decks.
+
+    Returns {operation: {class name: best time in seconds}}.
+    """
+    rng = random.Random(seed)
+    cards = [Card(rank, suit) for _ in range(num_decks) for suit in Deck.suits for rank in Deck.ranks]
+    rng.shuffle(cards)
+
+    def filled(player_class):
+        player = player_class("bench")
+        deck = _ListDeck(cards)
+        for _ in cards:
+            player.draw_card(deck)
+        return player
+
+    def ask_every_rank(player_class):
+        player = filled(player_class)
+        for rank in Deck.ranks:
+            if player.has_rank(rank):
+                player.hand.extend(player.remove_cards_by_rank(rank))
+
+    operations = {
+        'draw_card': lambda player_class: filled(player_class),
+        'has_rank': lambda player_class: [filled_players[player_class].has_rank(rank) for rank in Deck.ranks * 100],
+        'remove_and_receive': ask_every_rank,
+        'check_for_books': lambda player_class: filled(player_class).check_for_books(),
+    }
+    filled_players = {player_class: filled(player_class) for player_class in (ListPlayer, Player)}
+    variants = {player_class.__name__: player_class for player_class in (ListPlayer, Player)}
+    return time_variants(operations, variants, repeat)  # check_for_books prints every book
+
 
 # Setup the game
 if __name__ == "__main__":
-    num_players = int(input("Enter the number of players: "))
-    player_names = [input(f"Enter name for Player {i + 1}: ") for i in range(num_players)]
+    parser = argparse.ArgumentParser(description="Go Fish: interactive game or headless simulation.")
+    parser.add_argument('--simulate', type=int, metavar='GAMES', help="play GAMES headless games and report the results")
+    parser.add_argument('--policies', nargs='+', choices=sorted(POLICIES), default=['random', 'most_cards'],
+                        help="one policy per seat for --simulate")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--computer', type=int, default=0, metavar='N', help="add N AI players to the interactive game")
+    parser.add_argument('--benchmark-hands', type=int, metavar='DECKS', help="benchmark hand operations on DECKS decks")
+    args = parser.parse_args()
+
+    if args.benchmark_hands:
+        for operation, times in benchmark_hands(args.benchmark_hands).items():
+            print(f"{operation}: ListPlayer {times['ListPlayer'] * 1000:.3f} ms, Player {times['Player'] * 1000:.3f} ms")
+    elif args.simulate:
+        policies = [make_policy(name, reproducible=True) for name in args.policies]
+        start = time.perf_counter()
+        results = run_headless_games(args.simulate, policies, args.seed)
+        elapsed = time.perf_counter() - start
+        print(f"{results['games']} games in {elapsed:.2f}s ({results['games'] / elapsed:.0f} games/sec)")
+        for i, policy in enumerate(policies):
+            print(f"Player {i + 1} ({args.policies[i]}): {results['wins'][i]} wins, {results['books'][i]} books")
+    else:
+        num_players = int(input("Enter the number of players: "))
+        player_names = [input(f"Enter name for Player {i + 1}: ") for i in range(num_players)]
+        player_names += [f"Computer {i + 1}" for i in range(args.computer)]
+        policies = [None] * num_players + [InformationSetAI() for _ in range(args.computer)]
 
-    game = GoFishGame(player_names)
-    game.play_game()
+        game = GoFishGame(player_names, policies, random.Random(args.seed))
+        game.play_game()
@@ -0,0 +1,142 @@
+import argparse
+import random
+import struct
+
+from GoFishCardGame import ASK, BOOK, DEAL, FISH, POLICIES, TRANSFER, Deck, make_policy, run_headless_games
+
+# Binary event log. A game is written as
+#   GAME_START  record code, number of players, 64-bit seed
+#   events      record code (DEAL, ASK, ...), player, other, value, count
+#   GAME_END    record code, then the books of each player (one byte each)
+# Every event is a fixed 5-byte record, so a game is usually well under 1 KB.
+GAME_START = 0xF0
+GAME_END = 0xF1
+START_RECORD = struct.Struct('<BBQ')
+EVENT_RECORD = struct.Struct('<Bbbbb')
+
+
+class EventLog:
+    """Buffered writer for the binary event log; use it as a listener of GoFishGame or the headless engine."""
+
+    def __init__(self, path, buffer_size=1 << 16):
+        self.file = open(path, 'wb')
+        self.buffer = bytearray()
+        self.buffer_size = buffer_size
+        self.num_players = 0
+
+    def begin_game(self, seed, num_players):
+        self.num_players = num_players
+        self.buffer += START_RECORD.pack(GAME_START, num_players, seed)
+
+    def observe(self, event, player, other, value, count):
+        self.buffer += EVENT_RECORD.pack(event, player, other, value, count)
+
+    def end_game(self, books):
+        self.buffer.append(GAME_END)
+        self.buffer += bytes(books)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_event_log(path):
+    """Yields (seed, num_players, events, books) for every game in the log."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    position = 0
+    while position < len(data):
+        code, num_players, seed = START_RECORD.unpack_from(data, position)
+        if code != GAME_START:
+            raise ValueError(f"Corrupt event log: expected a game start at byte {position}.")
+        position += START_RECORD.size
+        events = []
+        while data[position] != GAME_END:
+            events.append(EVENT_RECORD.unpack_from(data, position))
+            position += EVENT_RECORD.size
+        books = list(data[position + 1:position + 1 + num_players])
+        position += 1 + num_players
+        yield seed, num_players, events, books
+
+
+class ReplayState:
+    """Game state rebuilt by replay_game: rank counts of every hand, books and the deck."""
+
+    def __init__(self, seed, num_players):
+        self.deck = Deck(random.Random(seed))  # Same shuffle the game was dealt from
+        self.hands = [[0] * 13 for _ in range(num_players)]
+        self.books = [0] * num_players
+        self.events_applied = 0
+
+    def draw(self, card_id):
+        card = self.deck.draw()
+        expected = self.deck.order[self.deck.remaining]
+        if card is None or expected != card_id:
+            raise ValueError(f"Event {self.events_applied}: card {card_id} is not next in the deck for this seed.")
+        return card_id % 13
+
+    def apply(self, event, player, other, value, count):
+        if event in (DEAL, FISH):
+            self.hands[player][self.draw(value)] += 1
+        elif event == TRANSFER:
+            if self.hands[other][value] != count:
+                raise ValueError(f"Event {self.events_applied}: player {other} does not hold {count} of rank {value}.")
+            self.hands[other][value] = 0
+            self.hands[player][value] += count
+        elif event == BOOK:
+            if self.hands[player][value] != 4:
+                raise ValueError(f"Event {self.events_applied}: player {player} has no book of rank {value}.")
+            self.hands[player][value] = 0
+            self.books[player] += 1
+        elif event != ASK:
+            raise ValueError(f"Event {self.events_applied}: unknown event code {event}.")
+        self.events_applied += 1
+
+
+def replay_game(seed, num_players, events, upto=None):
+    """Rebuilds the state of a game after its first upto events (all of them by default).
+
+    Every event is checked against the deck the seed deals, so a log that does
+    not match its seed raises ValueError.
+    """
+    state = ReplayState(seed, num_players)
+    for event in events[:upto]:
+        state.apply(*event)
+    return state
+
+
+def audit_log(path):
+    """Replays every game in the log and checks the final books; returns the number of games checked."""
+    games = 0
+    for seed, num_players, events, books in read_event_log(path):
+        state = replay_game(seed, num_players, events)
+        if state.books != books:
+            raise ValueError(f"Game {games} (seed {seed}): replay gives books {state.books}, log says {books}.")
+        games += 1
+    return games
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record headless Go Fish games to a binary event log and audit logs.")
+    parser.add_argument('path')
+    parser.add_argument('--record', type=int, metavar='GAMES', help="play and record GAMES games before auditing")
+    parser.add_argument('--policies', nargs='+', choices=sorted(POLICIES), default=['random', 'most_cards'])
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    if args.record:
+        with EventLog(args.path) as log:
+            run_headless_games(args.record, [make_policy(name, reproducible=True) for name in args.policies], args.seed, log)
+    print(f"{audit_log(args.path)} games replayed and verified.")
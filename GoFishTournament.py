@@ -0,0 +1,146 @@
+import argparse
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from GoFishCardGame import POLICIES, Deck, make_policy, play_headless_game
+from labtools import append_json_lines, read_json_lines
+
+
+def shard_seed(master_seed, shard):
+    """Seed of one shard; the same master seed always gives the same games, whatever the worker count."""
+    return f"{master_seed}-{shard}"
+
+
+def play_shard(policy_names, shard, num_games, master_seed):
+    """Worker: plays one shard and returns (shard, records).
+
+    records holds one byte per player per game (the books of that player),
+    which is far smaller to send back than a list of tuples.
+    """
+    policies = [make_policy(name, reproducible=True) for name in policy_names]
+    rng = random.Random(shard_seed(master_seed, shard))
+    deck = Deck(None)
+    records = bytearray()
+    for _ in range(num_games):
+        records += bytes(play_headless_game(policies, rng, deck))
+    return shard, bytes(records)
+
+
+def summarize_records(records, num_players):
+    """Folds one shard's records into win and book totals."""
+    wins = [0] * num_players
+    books = [0] * num_players
+    for start in range(0, len(records), num_players):
+        game = records[start:start + num_players]
+        wins[game.index(max(game))] += 1  # Ties go to the first player, like GoFishGame
+        for i in range(num_players):
+            books[i] += game[i]
+    return {'games': len(records) // num_players, 'wins': wins, 'books': books}
+
+
+def wilson_interval(successes, trials, z=1.96):
+    """95% Wilson score interval for a win rate."""
+    if trials == 0:
+        return 0.0, 0.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return centre - margin, centre + margin
+
+
+# Runs a tournament split into shards across worker processes. Every finished
+# shard is appended to the checkpoint file (one JSON line), so an interrupted
+# run picks up where it stopped when started again with the same settings.
+class Tournament:
+    def __init__(self, policy_names, num_games, shard_size=1000, master_seed=0, checkpoint=None):
+        self.policy_names = list(policy_names)
+        self.num_games = num_games
+        self.shard_size = shard_size
+        self.master_seed = master_seed
+        self.checkpoint = checkpoint
+        self.shard_results = {}  # shard -> summary
+
+    def shards(self):
+        """(shard, number of games) for every shard of the tournament."""
+        return [
+            (shard, min(self.shard_size, self.num_games - start))
+            for shard, start in enumerate(range(0, self.num_games, self.shard_size))
+        ]
+
+    def settings(self):
+        return {'policies': self.policy_names, 'games': self.num_games,
+                'shard_size': self.shard_size, 'seed': self.master_seed}
+
+    def load_checkpoint(self):
+        lines = read_json_lines(self.checkpoint)
+        if not lines:
+            return
+        if lines[0] != self.settings():
+            raise ValueError(f"Checkpoint '{self.checkpoint}' was written by a tournament with other settings.")
+        for line in lines[1:]:
+            self.shard_results[line['shard']] = line['summary']
+
+    def save_shard(self, shard, summary):
+        if not self.checkpoint:
+            return
+        with append_json_lines(self.checkpoint, header=self.settings()) as write:
+            write({'shard': shard, 'summary': summary})
+
+    def run(self, workers=None):
+        """Plays every shard not already in the checkpoint and returns the merged results."""
+        self.load_checkpoint()
+        todo = [(shard, games) for shard, games in self.shards() if shard not in self.shard_results]
+        num_players = len(self.policy_names)
+        if todo:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(play_shard, self.policy_names, shard, games, self.master_seed)
+                    for shard, games in todo
+                ]
+                for future in as_completed(futures):
+                    shard, records = future.result()
+                    summary = summarize_records(records, num_players)
+                    self.shard_results[shard] = summary
+                    self.save_shard(shard, summary)
+        return self.results()
+
+    def results(self):
+        """Merges the finished shards into win rates (with 95% intervals) and average books."""
+        num_players = len(self.policy_names)
+        games = sum(summary['games'] for summary in self.shard_results.values())
+        players = []
+        for i, name in enumerate(self.policy_names):
+            wins = sum(summary['wins'][i] for summary in self.shard_results.values())
+            books = sum(summary['books'][i] for summary in self.shard_results.values())
+            players.append({
+                'policy': name,
+                'wins': wins,
+                'win_rate': wins / games if games else 0.0,
+                'win_rate_95': wilson_interval(wins, games),
+                'books_per_game': books / games if games else 0.0,
+            })
+        return {'games': games, 'players': players}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-process Go Fish strategy tournament.")
+    parser.add_argument('policies', nargs='+', choices=sorted(POLICIES), help="one policy per seat")
+    parser.add_argument('--games', type=int, default=100000)
+    parser.add_argument('--shard-size', type=int, default=5000)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--checkpoint', help="file to record finished shards in, for resuming")
+    args = parser.parse_args()
+
+    tournament = Tournament(args.policies, args.games, args.shard_size, args.seed, args.checkpoint)
+    start = time.perf_counter()
+    results = tournament.run(args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{results['games']} games in {elapsed:.2f}s")
+    for seat, player in enumerate(results['players'], 1):
+        low, high = player['win_rate_95']
+        print(f"Seat {seat} ({player['policy']}): win rate {player['win_rate']:.3%} "
+              f"[{low:.3%}, {high:.3%}], {player['books_per_game']:.2f} books/game")
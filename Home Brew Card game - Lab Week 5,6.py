@@ -1,4 +1,9 @@
+import argparse
 import random
+import time
+from collections import deque
+
+from labtools import time_variants
 
 # card's info setup
 class Card:
@@ -26,7 +31,7 @@ class UnitCard(Card):
         self.hp = hp
 
     def play(self, player, opponent):
-        player.board.append(self)
+        player.board.add(self.attack, self.hp, self)
 
 # Spell Card class
 class SpellCard(Card):
@@ -47,53 +52,175 @@ class Node:
 class LinkedListDeck:
     def __init__(self):
         self.head = None
+        self.size = 0
+
+    @classmethod
+    def from_cards(cls, cards): #First card of the list ends up on top
+        deck = cls()
+        for card in reversed(list(cards)):
+            deck.add(card)
+        return deck
+
+    def __len__(self):
+        return self.size
 
     def add(self, card): #New node is created for each card added into the deck
         newNode = Node(card)
         newNode.next = self.head
         self.head = newNode
+        self.size += 1
 
     def draw(self): #Draw card from top of deck into hand, next card on top of the deck is now the head of the node.
         if self.head is None:
             return None
         drawnCard = self.head.card
         self.head = self.head.next
+        self.size -= 1
         return drawnCard
 
+#Array-backed Deck: cards are dealt from a cursor, so a draw is O(1) and the list is never shifted
+class CardDeck:
+    def __init__(self, cards=()):
+        self.cards = list(cards)
+        self.cursor = 0  # Index of the top card
+
+    def __len__(self):
+        return len(self.cards) - self.cursor
+
+    def add(self, card): #Goes to the bottom of the deck
+        self.cards.append(card)
+
+    def draw(self):
+        if self.cursor >= len(self.cards):
+            return None
+        card = self.cards[self.cursor]
+        self.cursor += 1
+        return card
+
+    def reshuffle(self, rng=random): #Shuffles the cards not drawn yet, in place
+        cards = self.cards
+        top = self.cursor
+        for i in range(len(cards) - 1, top, -1):
+            j = top + int(rng.random() * (i - top + 1))
+            cards[i], cards[j] = cards[j], cards[i]
+
+    def reset(self, rng=random): #Puts every drawn card back and shuffles the whole deck
+        self.cursor = 0
+        self.reshuffle(rng)
+
+#Units in play, front line first. Running totals of attack and remaining hp are
+#kept as units enter and leave, so an attack never has to add up the board.
+class Board:
+    def __init__(self):
+        self.units = deque()  # Card (or card id) of each unit
+        self.attacks = deque()
+        self.hps = deque()  # Remaining hp of each unit
+        self.total_attack = 0
+        self.total_hp = 0
+
+    def __len__(self):
+        return len(self.units)
+
+    def __iter__(self):
+        return iter(self.units)
+
+    def add(self, attack, hp, unit=None): #New units join the back of the line
+        self.units.append(unit)
+        self.attacks.append(attack)
+        self.hps.append(hp)
+        self.total_attack += attack
+        self.total_hp += hp
+
+    def take_damage(self, damage): #Front units absorb damage in order; returns (damage left over, units destroyed)
+        hps = self.hps
+        destroyed = 0
+        while damage > 0 and hps:
+            hp = hps[0]
+            if damage < hp:
+                hps[0] = hp - damage
+                self.total_hp -= damage
+                return 0, destroyed
+            damage -= hp
+            hps.popleft()
+            self.units.popleft()
+            self.total_attack -= self.attacks.popleft()
+            self.total_hp -= hp
+            destroyed += 1
+        return damage, destroyed
+
+#Resolves one attack in a batch: the attackers' total attack hits the blocking units
+#front first and whatever gets through hits the defending player, while the blockers
+#strike back at the attackers' front line. Amortized O(1): each unit is destroyed once.
+def resolve_combat(attackers, blockers):
+    counter = blockers.total_attack
+    through, blockers_lost = blockers.take_damage(attackers.total_attack)
+    attackers_lost = attackers.take_damage(counter)[1]
+    return through, blockers_lost, attackers_lost
+
+#Bounded log of one game: keeps the last capacity entries, so long games use constant memory
+class GameLog:
+    def __init__(self, capacity=1000):
+        self.entries = deque(maxlen=capacity)
+        self.total = 0  # Entries ever added, including the ones pushed out
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def add(self, entry):
+        self.entries.append(entry)
+        self.total += 1
+
+    def dropped(self):
+        return self.total - len(self.entries)
+
 # Represent players 
 class Player:
     def __init__(self, name):
         self.name = name  # what player
         self.health = 20  # Initial health 
-        self.deck = []  # List to hold the player's deck of cards
+        self.deck = CardDeck()  # The player's deck of cards (CardDeck or LinkedListDeck)
         self.hand = []  # List to hold the player's current hand of cards
-        self.board = []  # Holds units placed on the board
+        self.board = Board()  # Holds units placed on the board
 
     # draw card
     def drawCard(self):
-        if self.deck:
-            card = self.deck.pop(0)
+        card = self.deck.draw()
+        if card is not None:
             self.hand.append(card)
             print(f"{self.name} drew {card.name}.")
         else:
             print("Deck is empty!")
+        return card
+
+    # play the card at index of the hand; the rest of the hand keeps its order, so the shown indexes stay valid
+    def playCardAt(self, index, opponent):
+        card = self.hand[index]  # Raises IndexError for an invalid index
+        card.play(self, opponent)
+        del self.hand[index]
+        return card
 
     # play card 
     def playCard(self, card, opponent):
-        if card in self.hand:
-            card.play(self, opponent)
-            self.hand.remove(card)
-        else:
-            print(f"{card.name} is not in hand!")
+        for index, held in enumerate(self.hand):
+            if held is card:
+                self.playCardAt(index, opponent)
+                return
+        print(f"{card.name} is not in hand!")
 
-    # attack opponent method
+    # attack opponent method; the opponent's units block. Returns the damage dealt to the opponent
     def attack(self, opponent):
         if self.board:
-            total_attack = sum(unit.attack for unit in self.board)
-            opponent.health -= total_attack
-            print(f"{self.name}'s units attacked {opponent.name}, dealing {total_attack} damage.")
-        else:
-            print(f"{self.name} has no units to attack.")
+            damage, blockers_lost, attackers_lost = resolve_combat(self.board, opponent.board)
+            opponent.health -= damage
+            print(f"{self.name}'s units attacked {opponent.name}, dealing {damage} damage.")
+            if blockers_lost or attackers_lost:
+                print(f"{opponent.name} lost {blockers_lost} blocking units, {self.name} lost {attackers_lost} units.")
+            return damage
+        print(f"{self.name} has no units to attack.")
+        return 0
 
     # Displays player's health
     def display_health(self):
@@ -101,11 +228,10 @@ class Player:
 
 #Game loop
 class Game:
-    log = [] #Log to keep track of all actions taken in the game
-
-    def __init__(self, player1, player2): 
+    def __init__(self, player1, player2, log_capacity=1000): 
         self.players = [player1, player2]
         self.currentPlayerIndex = 0 #Keeps track of players' turn, 0 represents player1 and 1 represents player2
+        self.log = GameLog(log_capacity) #Log of the actions taken in this game
     
     #Initial draw
     def start(self):
@@ -125,7 +251,9 @@ class Game:
 
         #Print log of all actions that took place in game
         print("\nGame Log: ")
-        for entry in Game.log:
+        if self.log.dropped():
+            print(f"({self.log.dropped()} earlier entries not kept)")
+        for entry in self.log:
             print(entry)
 
     #Determine the current player and opponent
@@ -135,7 +263,9 @@ class Game:
 
         # Player's turn
         print(f"\n{player.name}'s turn:")
-        player.drawCard()
+        card = player.drawCard()
+        if card is not None:
+            self.log.add(f"{player.name} drew {card.name}")
 
         # Displays Player's health
         print(f"{player.name}'s health: {player.health}")
@@ -152,7 +282,8 @@ class Game:
 
             if choice == 'a':
                 # Proceed to attack phase
-                player.attack(opponent)
+                damage = player.attack(opponent)
+                self.log.add(f"{player.name} attacked {opponent.name} for {damage} damage")
                 break
             elif choice == 'e':
                 # End the card playing phase
@@ -167,13 +298,15 @@ class Game:
                         if unitPlayed:
                             print("You can only play one Unit Card per turn.")
                         else:
-                            player.playCard(card, opponent)
+                            player.playCardAt(card_index, opponent)
+                            self.log.add(f"{player.name} played {card.name}")
                             unitPlayed = True  # Mark that a Unit Card has been played
                     elif isinstance(card, SpellCard):
                         if spellPlayed:
                             print("You can only play one Spell Card per turn.")
                         else:
-                            player.playCard(card, opponent)
+                            player.playCardAt(card_index, opponent)
+                            self.log.add(f"{player.name} cast {card.name}")
                             spellPlayed = True  # Mark that a Spell Card has been played
                 except IndexError:
                     print("Invalid card index. Please choose a valid card from your hand.")
@@ -189,25 +322,14 @@ class Game:
             elif isinstance(card, SpellCard):
                 print(f"{i}: {card.name} (Spell) - {card.description}")
 
-# Create the players
-player1 = Player("Player 1")
-player2 = Player("Player 2")
-
-def create_deck():
-    deck = []
-    for i in range(3):
-        # Add unit cards
-        deck.append(UnitCard("Pikachu", "Electric-type pokemon", attack=4, hp=4))
-        deck.append(UnitCard("Charmander", "Fire-type pokemon", attack=5, hp=3))
-        deck.append(UnitCard("Squirtle", "Water-type pokemon", attack=3, hp=5))
-        deck.append(UnitCard("Bulbasaur", "Grass-type pokemone", attack=2, hp=6))
-        
-        # Add spell cards with proper effect functions
-        deck.append(SpellCard("Healing Spell", "Heals 5 health", effect=heal_5_health))
-        deck.append(SpellCard("Fireball", "Deals 4 damage to opponent", effect=deal_4_damage))
-
-    random.shuffle(deck)  # Shuffle the deck
-    return deck
+def create_deck(card_ids=None, linked=False, rng=random):
+    """Builds a deck of card objects from card ids (three copies of every card by default), shuffled with rng.
+
+    Returns a CardDeck, or a LinkedListDeck when linked is true.
+    """
+    cards = [make_card(card_id) for card_id in (DEFAULT_DECK if card_ids is None else card_ids)]
+    rng.shuffle(cards)  # Shuffle the deck
+    return LinkedListDeck.from_cards(cards) if linked else CardDeck(cards)
 
 # Functions for SpellCard effects
 def heal_5_health(player, opponent):
@@ -218,10 +340,260 @@ def deal_4_damage(player, opponent):
     opponent.health -= 4
     print(f"{player.name} dealt 4 damage to {opponent.name}!")
 
-# Assign the decks to the players
-player1.deck = create_deck()
-player2.deck = create_deck()
 
-# Start the game
-game = Game(player1, player2)
-game.start()
+# Card table. The headless engine works with cards as integer ids into these
+# columns, so a deck is just a list of ids; make_card turns an id into the
+# UnitCard/SpellCard the interactive game uses.
+UNIT = 0
+SPELL = 1
+CARD_TABLE = [
+    # name, description, kind, attack, hp, damage, heal
+    ("Pikachu", "Electric-type pokemon", UNIT, 4, 4, 0, 0),
+    ("Charmander", "Fire-type pokemon", UNIT, 5, 3, 0, 0),
+    ("Squirtle", "Water-type pokemon", UNIT, 3, 5, 0, 0),
+    ("Bulbasaur", "Grass-type pokemone", UNIT, 2, 6, 0, 0),
+    ("Healing Spell", "Heals 5 health", SPELL, 0, 0, 0, 5),
+    ("Fireball", "Deals 4 damage to opponent", SPELL, 0, 0, 4, 0),
+]
+CARD_NAMES = tuple(row[0] for row in CARD_TABLE)
+CARD_KINDS = tuple(row[2] for row in CARD_TABLE)
+CARD_ATTACK = tuple(row[3] for row in CARD_TABLE)
+CARD_HP = tuple(row[4] for row in CARD_TABLE)
+CARD_DAMAGE = tuple(row[5] for row in CARD_TABLE)
+CARD_HEAL = tuple(row[6] for row in CARD_TABLE)
+CARD_IDS = {name: card_id for card_id, name in enumerate(CARD_NAMES)}
+SPELL_EFFECTS = {"Healing Spell": heal_5_health, "Fireball": deal_4_damage}
+DEFAULT_DECK = [card_id for _ in range(3) for card_id in range(len(CARD_TABLE))]
+
+
+def make_card(card_id):
+    name, description, kind, attack, hp, damage, heal = CARD_TABLE[card_id]
+    if kind == UNIT:
+        return UnitCard(name, description, attack=attack, hp=hp)
+    return SpellCard(name, description, effect=SPELL_EFFECTS[name])
+
+
+# Headless engine: the same rules as Game (draw five, then each turn draw one,
+# play at most one unit and one spell, then attack with the whole board into
+# the opponent's blockers) without any printing or input. Agents decide a turn with
+# agent(me, opponent, rng) -> (unit hand index, spell hand index, attack?),
+# using -1 to skip a play.
+class SimPlayer:
+    __slots__ = ('health', 'deck', 'hand', 'board')
+
+    def __init__(self, deck, rng):
+        self.health = 20
+        self.deck = CardDeck(deck)  # Card ids, shuffled with rng
+        self.deck.reshuffle(rng)
+        self.hand = []
+        self.board = Board()  # Units are card ids
+
+    def draw(self):
+        card = self.deck.draw()
+        if card is not None:
+            self.hand.append(card)
+
+
+def random_agent(me, opponent, rng):
+    """Plays a random unit and a random spell, each half the time, and always attacks."""
+    units = []
+    spells = []
+    for i, card in enumerate(me.hand):
+        (spells if CARD_KINDS[card] == SPELL else units).append(i)
+    random = rng.random
+    unit = units[int(random() * len(units))] if units and random() < 0.5 else -1
+    spell = spells[int(random() * len(spells))] if spells and random() < 0.5 else -1
+    return unit, spell, True
+
+
+def greedy_agent(me, opponent, rng):
+    """Plays its strongest unit and its best damage spell (a heal when hurt), and always attacks."""
+    unit = spell = -1
+    best_attack = best_spell = 0
+    hurt = me.health <= 15
+    for i, card in enumerate(me.hand):
+        if CARD_KINDS[card] == UNIT:
+            if CARD_ATTACK[card] > best_attack:
+                unit, best_attack = i, CARD_ATTACK[card]
+        else:
+            value = CARD_DAMAGE[card] + (CARD_HEAL[card] if hurt else 0)
+            if value > best_spell:
+                spell, best_spell = i, value
+    return unit, spell, True
+
+
+AGENTS = {'random': random_agent, 'greedy': greedy_agent}
+
+
+def play_headless_match(decks, agents, rng, first=0, max_turns=200, log=None):
+    """Plays one game between two decks of card ids; returns the winner's index, or -1 for a draw.
+
+    Each deck is shuffled with rng, so the same seed plays the same game.
+    log (a GameLog) receives (turn, player, action, card id or damage) tuples.
+    """
+    players = [SimPlayer(deck, rng) for deck in decks]
+    for player in players:
+        for _ in range(5):
+            player.draw()
+    current = first
+    for turn in range(max_turns):
+        me, opponent = players[current], players[1 - current]
+        me.draw()
+        unit, spell, attack = agents[current](me, opponent, rng)
+        hand = me.hand
+        if unit >= 0:
+            card = hand[unit]
+            if CARD_KINDS[card] != UNIT:
+                raise ValueError(f"{CARD_NAMES[card]} is not a unit card.")
+            me.board.add(CARD_ATTACK[card], CARD_HP[card], card)
+            if log is not None:
+                log.add((turn, current, 'unit', card))
+        if spell >= 0:
+            card = hand[spell]
+            if CARD_KINDS[card] != SPELL:
+                raise ValueError(f"{CARD_NAMES[card]} is not a spell card.")
+            me.health += CARD_HEAL[card]
+            opponent.health -= CARD_DAMAGE[card]
+            if log is not None:
+                log.add((turn, current, 'spell', card))
+        if unit > spell:
+            del hand[unit]
+            if spell >= 0:
+                del hand[spell]
+        elif spell >= 0:
+            del hand[spell]
+            if unit >= 0:
+                del hand[unit]
+        if attack and me.board:
+            damage = resolve_combat(me.board, opponent.board)[0]
+            opponent.health -= damage
+            if log is not None:
+                log.add((turn, current, 'attack', damage))
+        if me.health <= 0 or opponent.health <= 0:
+            return current  # Like Game.start, the player whose turn it is wins
+        current = 1 - current
+    return -1
+
+
+def run_headless_matches(num_games, decks, agents, seed=None, max_turns=200):
+    """Plays num_games games between two decks; the first player alternates every game.
+
+    One RNG seeded with seed drives the whole batch (reseeding per game would cost as
+    much as playing it), so the same seed always gives the same results.
+    Returns the wins of each deck and the number of draws.
+    """
+    rng = random.Random(seed)
+    wins = [0, 0]
+    draws = 0
+    for game in range(num_games):
+        winner = play_headless_match(decks, agents, rng, game % 2, max_turns)
+        if winner < 0:
+            draws += 1
+        else:
+            wins[winner] += 1
+    return {'games': num_games, 'wins': wins, 'draws': draws}
+
+
+# Micro-benchmarks: CardDeck and LinkedListDeck with index-addressed plays
+# against the original list deck (pop(0)) and hand (in + remove)
+class ListPlayer(Player):
+    """The original list-based deck and hand, kept as the benchmark baseline."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.deck = []
+
+    def drawCard(self):
+        if self.deck:
+            card = self.deck.pop(0)
+            self.hand.append(card)
+            print(f"{self.name} drew {card.name}.")
+        else:
+            print("Deck is empty!")
+
+    def playCard(self, card, opponent):
+        if card in self.hand:
+            card.play(self, opponent)
+            self.hand.remove(card)
+        else:
+            print(f"{card.name} is not in hand!")
+
+
+def benchmark_decks(deck_size=20000, repeat=3, seed=0):
+    """Times drawing a whole deck of deck_size cards, then playing the hand in random order.
+
+    Returns {operation: {deck kind: best time in seconds}}.
+    """
+    rng = random.Random(seed)
+    card_ids = [rng.randrange(len(CARD_TABLE)) for _ in range(deck_size)]
+    cards = [make_card(card_id) for card_id in card_ids]
+    play_order = [rng.randrange(size) for size in range(deck_size, 0, -1)]  # Hand index of each play
+
+    def filled(kind):
+        if kind == 'list':
+            player = ListPlayer("bench")
+            player.deck = list(cards)
+        else:
+            player = Player("bench")
+            player.deck = LinkedListDeck.from_cards(cards) if kind == 'linked' else CardDeck(cards)
+        for _ in range(deck_size):
+            player.drawCard()
+        return player
+
+    def play_all(kind):
+        player = filled(kind)
+        opponent = Player("opponent")
+        for index in play_order:
+            if kind == 'list':
+                player.playCard(player.hand[index], opponent)
+            else:
+                player.playCardAt(index, opponent)
+
+    operations = {
+        'draw': filled,
+        'draw_and_play': play_all,
+    }
+    return time_variants(operations, {kind: kind for kind in ('list', 'array', 'linked')}, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Home Brew card game: interactive game or headless simulation.")
+    parser.add_argument('--simulate', type=int, metavar='GAMES', help="play GAMES headless games and report the results")
+    parser.add_argument('--agents', nargs=2, choices=sorted(AGENTS), default=['greedy', 'random'],
+                        help="the agents of the two players for --simulate")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--linked-deck', action='store_true', help="deal the interactive game from LinkedListDecks")
+    parser.add_argument('--benchmark-decks', type=int, metavar='CARDS', help="benchmark decks and hands of CARDS cards")
+    args = parser.parse_args()
+
+    if args.benchmark_decks:
+        for operation, times in benchmark_decks(args.benchmark_decks).items():
+            print(f"{operation}: " + ", ".join(f"{kind} {seconds * 1000:.1f} ms" for kind, seconds in times.items()))
+        return
+    if args.simulate:
+        agents = [AGENTS[name] for name in args.agents]
+        start = time.perf_counter()
+        results = run_headless_matches(args.simulate, [DEFAULT_DECK, DEFAULT_DECK], agents, args.seed)
+        elapsed = time.perf_counter() - start
+        print(f"{results['games']} games in {elapsed:.2f}s ({results['games'] / elapsed:.0f} games/sec)")
+        for i, name in enumerate(args.agents):
+            print(f"Player {i + 1} ({name}): {results['wins'][i]} wins")
+        print(f"Draws: {results['draws']}")
+        return
+
+    # Create the players
+    player1 = Player("Player 1")
+    player2 = Player("Player 2")
+
+    # Assign the decks to the players; the same seed deals the same decks
+    rng = random.Random(args.seed)
+    player1.deck = create_deck(linked=args.linked_deck, rng=rng)
+    player2.deck = create_deck(linked=args.linked_deck, rng=rng)
+
+    # Start the game
+    game = Game(player1, player2)
+    game.start()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import argparse
+import hashlib
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from labs import load_lab
+from labtools import append_json_lines, read_json_lines
+
+
+def game_module():
+    """The Week 5/6 lab module (its file name is not a valid module name, so labs loads it by path)."""
+    return load_lab('homebrew')
+
+
+def deck_cards(counts):
+    """Card ids of a deck given as copies per card id."""
+    return [card_id for card_id, count in enumerate(counts) for _ in range(count)]
+
+
+def play_matchup(deck, opponent, agent_names, games, seed, max_turns):
+    """Worker: plays deck against opponent (both as copies per card id); returns (wins, losses, draws)."""
+    module = game_module()
+    agents = [module.AGENTS[name] for name in agent_names]
+    results = module.run_headless_matches(games, [deck_cards(deck), deck_cards(opponent)], agents, seed, max_turns)
+    return results['wins'][0], results['wins'][1], results['draws']
+
+
+# Matchup results on disk, one JSON line per matchup, keyed by a hash of
+# everything that decides the result: both decks, the card table, the agents,
+# the number of games and the seed. Changing any card's stats gives new keys,
+# so stale results are never reused.
+class MatchupCache:
+    def __init__(self, path=None):
+        self.path = path
+        self.results = {}  # key -> [wins, losses, draws]
+        self.hits = 0
+        for entry in read_json_lines(path):
+            self.results[entry['key']] = entry['result']
+
+    @staticmethod
+    def key(deck, opponent, agent_names, games, seed, max_turns):
+        module = game_module()
+        content = json.dumps({
+            'cards': [row[2:] for row in module.CARD_TABLE],  # kind, attack, hp, damage, heal
+            'decks': [list(deck), list(opponent)],
+            'agents': list(agent_names),
+            'games': games,
+            'seed': seed,
+            'max_turns': max_turns,
+        }, sort_keys=True)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        result = self.results.get(key)
+        if result is not None:
+            self.hits += 1
+        return result
+
+    def put(self, key, result):
+        self.results[key] = list(result)
+        if self.path:
+            with append_json_lines(self.path) as write:
+                write({'key': key, 'result': list(result)})
+
+
+# Genetic search over decks. A deck is a tuple of copies per card id with a
+# fixed size. Fitness is the mean score (wins plus half the draws) against a
+# fixed gauntlet: the default deck and a few random ones. Every generation
+# keeps the best quarter and fills the rest with mutated crossovers of
+# tournament-selected parents; the matchups not in the cache are played in a
+# process pool.
+class DeckOptimizer:
+    def __init__(self, deck_size=18, max_copies=6, population=24, gauntlet_size=4, games=2000,
+                 agent_names=('greedy', 'greedy'), seed=0, max_turns=200, cache=None, workers=None):
+        module = game_module()
+        self.num_cards = len(module.CARD_TABLE)
+        if deck_size > self.num_cards * max_copies:
+            raise ValueError(f"A {deck_size}-card deck needs more than {max_copies} copies of some card.")
+        self.deck_size = deck_size
+        self.max_copies = max_copies
+        self.population_size = population
+        self.games = games
+        self.agent_names = list(agent_names)
+        self.max_turns = max_turns
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.cache = cache if cache is not None else MatchupCache()
+        self.workers = workers
+        self.default_deck = self.counts(module.DEFAULT_DECK)
+        self.gauntlet = [self.default_deck] + [self.random_deck() for _ in range(gauntlet_size)]
+        self.matchups_played = 0
+
+    def counts(self, card_ids):
+        counts = [0] * self.num_cards
+        for card_id in card_ids:
+            counts[card_id] += 1
+        return tuple(counts)
+
+    def fits(self, deck):
+        """True if deck has deck_size cards and no more than max_copies of any card."""
+        return sum(deck) == self.deck_size and max(deck) <= self.max_copies
+
+    def random_deck(self):
+        counts = [0] * self.num_cards
+        for _ in range(self.deck_size):
+            card_id = self.rng.choice([i for i in range(self.num_cards) if counts[i] < self.max_copies])
+            counts[card_id] += 1
+        return tuple(counts)
+
+    def mutate(self, deck, swaps=1):
+        """Moves swaps copies from one card to another."""
+        counts = list(deck)
+        for _ in range(swaps):
+            giver = self.rng.choice([i for i in range(self.num_cards) if counts[i] > 0])
+            takers = [i for i in range(self.num_cards) if i != giver and counts[i] < self.max_copies]
+            if not takers:
+                break  # Every other card is already at max_copies
+            taker = self.rng.choice(takers)
+            counts[giver] -= 1
+            counts[taker] += 1
+        return tuple(counts)
+
+    def crossover(self, a, b):
+        """Each card count from one parent at random, then cards added or removed to fix the deck size."""
+        counts = [self.rng.choice(pair) for pair in zip(a, b)]
+        while sum(counts) > self.deck_size:
+            counts[self.rng.choice([i for i in range(self.num_cards) if counts[i] > 0])] -= 1
+        while sum(counts) < self.deck_size:
+            counts[self.rng.choice([i for i in range(self.num_cards) if counts[i] < self.max_copies])] += 1
+        return tuple(counts)
+
+    def evaluate(self, decks):
+        """Fitness of every deck; plays the uncached matchups in parallel."""
+        keys = {}
+        todo = {}
+        for deck in decks:
+            for opponent in self.gauntlet:
+                key = self.cache.key(deck, opponent, self.agent_names, self.games, self.seed, self.max_turns)
+                keys[deck, opponent] = key
+                if self.cache.get(key) is None and key not in todo:
+                    todo[key] = (deck, opponent)
+        if todo:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = {
+                    key: executor.submit(play_matchup, deck, opponent, self.agent_names, self.games, self.seed,
+                                         self.max_turns)
+                    for key, (deck, opponent) in todo.items()
+                }
+                for key, future in futures.items():
+                    self.cache.put(key, future.result())
+            self.matchups_played += len(todo)
+        fitness = {}
+        for deck in decks:
+            score = 0.0
+            for opponent in self.gauntlet:
+                wins, losses, draws = self.cache.results[keys[deck, opponent]]
+                score += (wins + 0.5 * draws) / self.games
+            fitness[deck] = score / len(self.gauntlet)
+        return fitness
+
+    def select(self, ranked, fitness, size=3):
+        """Tournament selection: the fittest of size random decks."""
+        return max(self.rng.sample(ranked, min(size, len(ranked))), key=fitness.get)
+
+    def run(self, generations=30, patience=8, report=None):
+        """Evolves decks until generations run out or the best deck stops improving for patience generations.
+
+        Returns (best deck, its fitness, fitness of the default deck).
+        """
+        # The default deck always stays in the gauntlet, but only competes when it fits the constraints
+        population = {self.default_deck} if self.fits(self.default_deck) else set()
+        attempts = 0
+        while len(population) < self.population_size and attempts < 100 * self.population_size:
+            population.add(self.random_deck())  # Tight constraints may allow fewer distinct decks
+            attempts += 1
+        best, best_fitness, stale = None, -1.0, 0
+        fitness = {}
+        for generation in range(generations):
+            fitness.update(self.evaluate(list(population)))
+            ranked = sorted(population, key=fitness.get, reverse=True)
+            if fitness[ranked[0]] > best_fitness:
+                best, best_fitness, stale = ranked[0], fitness[ranked[0]], 0
+            else:
+                stale += 1
+            if report:
+                report(generation, best, best_fitness)
+            if stale >= patience:
+                break
+            population = set(ranked[:max(2, self.population_size // 4)])
+            attempts = 0
+            while len(population) < self.population_size and attempts < 100 * self.population_size:
+                child = self.crossover(self.select(ranked, fitness), self.select(ranked, fitness))
+                population.add(self.mutate(child, self.rng.randint(1, 2)))
+                attempts += 1
+        default_fitness = fitness.get(self.default_deck)
+        if default_fitness is None:
+            default_fitness = self.evaluate([self.default_deck])[self.default_deck]
+        return best, best_fitness, default_fitness
+
+    def describe(self, deck):
+        names = game_module().CARD_NAMES
+        return ", ".join(f"{count}x {names[card_id]}" for card_id, count in enumerate(deck) if count)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search for strong Home Brew decks with a genetic algorithm.")
+    parser.add_argument('--generations', type=int, default=30)
+    parser.add_argument('--patience', type=int, default=8, help="Stop after this many generations without improvement")
+    parser.add_argument('--population', type=int, default=24)
+    parser.add_argument('--gauntlet', type=int, default=4, help="Random opponent decks besides the default deck")
+    parser.add_argument('--games', type=int, default=2000, help="Games per matchup")
+    parser.add_argument('--deck-size', type=int, default=18)
+    parser.add_argument('--max-copies', type=int, default=6)
+    parser.add_argument('--agents', nargs=2, default=['greedy', 'greedy'], help="Agents of the candidate and the opponent")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--cache', default='home_brew_matchups.jsonl', help="Persistent matchup cache (JSON lines)")
+    args = parser.parse_args()
+
+    cache = MatchupCache(args.cache)
+    optimizer = DeckOptimizer(args.deck_size, args.max_copies, args.population, args.gauntlet, args.games,
+                              args.agents, args.seed, cache=cache, workers=args.workers)
+    start = time.perf_counter()
+
+    def report(generation, deck, fitness):
+        print(f"Generation {generation + 1}: best {fitness:.3f} ({optimizer.describe(deck)}) "
+              f"[{optimizer.matchups_played} matchups played, {cache.hits} cached, {time.perf_counter() - start:.1f}s]")
+
+    best, best_fitness, default_fitness = optimizer.run(args.generations, args.patience, report)
+    print(f"\nBest deck: {optimizer.describe(best)}")
+    print(f"Score against the gauntlet: {best_fitness:.3f} (default deck {default_fitness:.3f})")
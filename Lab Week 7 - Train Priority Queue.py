@@ -1,5 +1,10 @@
-import random
 import heapq
+import itertools
+import random
+from array import array
+from collections import defaultdict, deque
+
+from TrainRouting import StationGraph
 
 class Passenger:
     def __init__(self, start_station, destination_station, priority):
@@ -7,56 +12,202 @@ class Passenger:
         self.destination_station = destination_station
         self.priority = priority
         self.on_board = False  # Track if the passenger is on board
+        self.queued_at = None  # Minutes when the passenger joined a station queue or the emergency stack
+        self.boarded_at = None
 
     def __lt__(self, other):
         return self.priority < other.priority  
 
-def generate_passengers(num_passengers, stations):
+def random_trips(count, stations, rng=random):
+    """count (start, destination) pairs with destination != start, without building a station list per trip."""
+    last = len(stations) - 1
+    trips = []
+    for start in rng.choices(range(len(stations)), k=count):
+        destination = int(rng.random() * last)
+        if destination >= start:
+            destination += 1  # Skip over the start station
+        trips.append((stations[start], stations[destination]))
+    return trips
+
+def generate_passengers(num_passengers, stations, rng=random, router=None):
+    """Random passengers ranked by route minutes; without a router the stations form a line 10 minutes apart."""
+    if router is None:
+        router = StationGraph.line(stations).planner()
     passengers = []
-    for i in range(num_passengers):
-        start_station = random.choice(stations)
-        destination_station = random.choice([station for station in stations if station != start_station])
-        priority = calculate_priority(start_station, destination_station)  # Use the priority calculation
+    for start_station, destination_station in random_trips(num_passengers, stations, rng):
+        priority = calculate_priority(start_station, destination_station, router)  # Use the priority calculation
         passengers.append(Passenger(start_station, destination_station, priority))
     return passengers
 
-def generate_emergency_passengers(num_emergency, stations):
+def generate_emergency_passengers(num_emergency, stations, rng=random):
     emergency_passengers = []
-    for i in range(num_emergency):
-        start_station = random.choice(stations)
-        destination_station = random.choice([station for station in stations if station != start_station])
+    for start_station, destination_station in random_trips(num_emergency, stations, rng):
         emergency_passengers.append(Passenger(start_station, destination_station, priority=0))  # Emergency has the highest priority
     return emergency_passengers
 
 # Priority calculation based on start and destination stations
-def calculate_priority(start_station, destination_station):
-    distance = abs(ord(start_station) - ord(destination_station))
-    return distance  # Lower distance = higher priority
-
+def calculate_priority(start_station, destination_station, router):
+    return router.distance(start_station, destination_station)  # Shortest route in minutes; lower = higher priority
+
+# Indexed binary heap: every passenger's slot is tracked, so one priority can
+# be changed or one passenger removed in O(log n) without rebuilding the heap.
+# Entries are [priority, sequence, passenger]; the sequence number breaks
+# ties in arrival order (FIFO).
+#
+# Lazy mode: give a priority_function(passenger, reference) and call
+# set_reference() (e.g. with the train's current station) instead of
+# recalculating. Nothing is re-scored until the queue is next inspected; then
+# every entry is re-scored in one pass and the heap is rebuilt bottom-up in
+# O(n), so the top is exact for any priority function.
 class PriorityQueue:
-    def __init__(self):
+    def __init__(self, priority_function=None):
         self.queue = []
-
-    def add(self, passenger):
-        heapq.heappush(self.queue, passenger)  # Push passenger onto the heap
+        self.positions = {}  # Passenger -> index of its entry in the heap
+        self.sequence = itertools.count()
+        self.priority_function = priority_function
+        self.reference = None
+        self.stale = False  # Lazy mode: the reference moved since the entries were scored
+
+    def __len__(self):
+        return len(self.queue)
+
+    def __contains__(self, passenger):
+        return passenger in self.positions
+
+    def add(self, passenger, priority=None):
+        if self.priority_function is not None:
+            priority = self.priority_function(passenger, self.reference)
+        elif priority is None:
+            priority = passenger.priority
+        passenger.priority = priority
+        entry = [priority, next(self.sequence), passenger]
+        self.queue.append(entry)
+        self.positions[passenger] = len(self.queue) - 1
+        self._sift_up(len(self.queue) - 1)
+
+    def add_many(self, passengers):
+        """Adds a batch of passengers; a batch bigger than the heap is heapified bottom-up in O(n + k)."""
+        queue = self.queue
+        start = len(queue)
+        for passenger in passengers:
+            if self.priority_function is not None:
+                priority = self.priority_function(passenger, self.reference)
+            else:
+                priority = passenger.priority
+            passenger.priority = priority
+            self.positions[passenger] = len(queue)
+            queue.append([priority, next(self.sequence), passenger])
+        if len(queue) - start > start:
+            self._heapify()
+        else:
+            for index in range(start, len(queue)):
+                self._sift_up(index)
+
+    def peek(self):
+        """Returns the passenger with the highest priority without removing it."""
+        self._refresh_top()
+        return self.queue[0][2] if self.queue else None
 
     def get(self):
-        return heapq.heappop(self.queue) if self.queue else None  # Pop the passenger with the highest priority
+        self._refresh_top()
+        if not self.queue:
+            return None
+        return self._remove_at(0)  # Pop the passenger with the highest priority
 
     def is_empty(self):
         return len(self.queue) == 0
 
-    # Recalculate priority based on current start and destination stations
-    def recalculate_priorities(self, stations):
-        new_queue = []
-        while not self.is_empty():
-            passenger = self.get()
-            passenger.priority = calculate_priority(passenger.start_station, passenger.destination_station)
-            new_queue.append(passenger)
+    def update(self, passenger, new_priority):
+        """Changes one passenger's priority in O(log n), keeping its place among equal priorities."""
+        index = self.positions[passenger]
+        entry = self.queue[index]
+        old_priority = entry[0]
+        entry[0] = new_priority
+        passenger.priority = new_priority
+        if new_priority < old_priority:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def remove(self, passenger):
+        """Removes a passenger from anywhere in the queue in O(log n)."""
+        return self._remove_at(self.positions[passenger])
+
+    def set_reference(self, reference):
+        """Lazy mode: priorities are now relative to reference; entries are re-scored when inspected."""
+        if reference != self.reference:
+            self.reference = reference
+            self.stale = True
 
-        # Push back all passengers with updated priorities
-        for passenger in new_queue:
-            self.add(passenger)
+    # Recalculate priority based on current start and destination stations
+    def recalculate_priorities(self, stations, router=None):
+        if self.priority_function is None and router is None:
+            router = StationGraph.line(stations).planner()
+        for entry in list(self.queue):
+            passenger = entry[2]
+            if self.priority_function is not None:
+                priority = self.priority_function(passenger, self.reference)
+            else:
+                priority = calculate_priority(passenger.start_station, passenger.destination_station, router)
+            if priority != entry[0]:
+                self.update(passenger, priority)  # Only changed entries move
+        self.stale = False
+
+    def _refresh_top(self):
+        if not self.stale:
+            return
+        self.stale = False
+        priority_function, reference = self.priority_function, self.reference
+        for entry in self.queue:
+            entry[0] = entry[2].priority = priority_function(entry[2], reference)
+        self._heapify()
+
+    def _heapify(self):
+        for index in range(len(self.queue) // 2 - 1, -1, -1):
+            self._sift_down(index)
+
+    def _remove_at(self, index):
+        queue = self.queue
+        entry = queue[index]
+        last = queue.pop()
+        del self.positions[entry[2]]
+        if index < len(queue):
+            queue[index] = last
+            self.positions[last[2]] = index
+            self._sift_down(index)
+            self._sift_up(index)
+        return entry[2]
+
+    def _sift_up(self, index):
+        queue = self.queue
+        entry = queue[index]
+        while index > 0:
+            parent = (index - 1) // 2
+            if not entry[:2] < queue[parent][:2]:
+                break
+            queue[index] = queue[parent]
+            self.positions[queue[index][2]] = index
+            index = parent
+        queue[index] = entry
+        self.positions[entry[2]] = index
+
+    def _sift_down(self, index):
+        queue = self.queue
+        entry = queue[index]
+        size = len(queue)
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and queue[child + 1][:2] < queue[child][:2]:
+                child += 1
+            if not queue[child][:2] < entry[:2]:
+                break
+            queue[index] = queue[child]
+            self.positions[queue[index][2]] = index
+            index = child
+        queue[index] = entry
+        self.positions[entry[2]] = index
 
 class EmergencyStack:
     def __init__(self):
@@ -72,30 +223,126 @@ class EmergencyStack:
         return len(self.stack) == 0
 
 
+class StationQueue:
+    """Passengers waiting at one station, oldest first. Both ends are O(1).
+
+    With a capacity, arrivals beyond it are turned away and counted in rejected.
+    """
+    def __init__(self, capacity=None):
+        self.passengers = deque()
+        self.arrival_times = deque()
+        self.capacity = capacity
+        self.max_depth = 0
+        self.rejected = 0
+        self.boarded = 0
+        self.total_wait = 0
+        self.max_wait = 0
+
+    def __len__(self):
+        return len(self.passengers)
+
+    def append(self, passenger, time=0):
+        if self.capacity is not None and len(self.passengers) >= self.capacity:
+            self.rejected += 1
+            return False
+        self.passengers.append(passenger)
+        self.arrival_times.append(time)
+        if len(self.passengers) > self.max_depth:
+            self.max_depth = len(self.passengers)
+        return True
+
+    def popleft(self, time=0):
+        wait = time - self.arrival_times.popleft()
+        self.boarded += 1
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+        return self.passengers.popleft()
+
+    def take_all(self, time=0, limit=None):
+        """Removes up to limit passengers (all by default) in arrival order."""
+        count = len(self.passengers) if limit is None else min(limit, len(self.passengers))
+        taken = [self.passengers.popleft() for _ in range(count)]
+        for _ in range(count):
+            wait = time - self.arrival_times.popleft()
+            self.total_wait += wait
+            if wait > self.max_wait:
+                self.max_wait = wait
+        self.boarded += count
+        return taken
+
+    def average_wait(self):
+        return self.total_wait / self.boarded if self.boarded else 0
+
+    def stats(self):
+        return {'depth': len(self.passengers), 'max_depth': self.max_depth, 'boarded': self.boarded,
+                'rejected': self.rejected, 'average_wait': self.average_wait(), 'max_wait': self.max_wait}
+
+
 class TrainSystem:
-    def __init__(self, stations=['A', 'B', 'C', 'D']):
+    def __init__(self, stations=['A', 'B', 'C', 'D'], lazy_priorities=False, queue_capacity=None, verbose=True,
+                 graph=None):
+        """lazy_priorities ranks passengers by distance from the train's current station instead of trip length.
+
+        queue_capacity caps how many passengers can wait at each station; verbose=False boards without a line per passenger.
+        graph is a StationGraph with travel minutes; without one the stations form a line 10 minutes apart.
+        Priorities are shortest-route minutes looked up in the graph's route planner.
+        """
         self.stations = stations
         self.current_station = stations[0]  # Start at station 'A'
-        self.priority_queue = PriorityQueue()
+        self.lazy_priorities = lazy_priorities
+        self._graph = graph
+        if lazy_priorities:
+            self.priority_queue = PriorityQueue(
+                lambda passenger, station: calculate_priority(station, passenger.destination_station, self.router)
+            )
+            self.priority_queue.set_reference(self.current_station)
+        else:
+            self.priority_queue = PriorityQueue(
+                lambda passenger, station: calculate_priority(passenger.start_station, passenger.destination_station, self.router)
+            )
         self.emergency_stack = EmergencyStack()
         self.travel_times = []
         self.total_time = 0
         self.cycle = 1
-        self.station_queues = {station: [] for station in stations}  # Initialize station queues
+        self.verbose = verbose
+
+        # Per-passenger latencies in minutes, and the total queue depth sampled once per cycle
+        self.wait_times = array('d')
+        self.ride_times = array('d')
+        self.total_times = array('d')
+        self.emergency_latencies = array('d')
+        self.depth_times = array('d')
+        self.depth_samples = array('l')
+        self.station_queues = {station: StationQueue(queue_capacity) for station in stations}  # Initialize station queues
+
+    @property
+    def graph(self):
+        """The station graph, built on first use when none was given."""
+        if self._graph is None:
+            self._graph = StationGraph.line(self.stations)
+        return self._graph
+
+    @property
+    def router(self):
+        return self.graph.planner()  # The graph builds its route planner on first use, too
+
+    def say(self, message):
+        if self.verbose:
+            print(message)
 
     def print_cycle_header(self):
-        print(f"\nCycle {self.cycle}: Train at {self.current_station}")
-        print(f"Current time: {self.total_time} minutes")
+        self.say(f"\nCycle {self.cycle}: Train at {self.current_station}")
+        self.say(f"Current time: {self.total_time} minutes")
         self.cycle += 1
 
     def move_to_station(self, destination_station):
         if self.current_station == destination_station:
-            print(f"Already at {destination_station}, no movement needed.")
+            self.say(f"Already at {destination_station}, no movement needed.")
             return 0  
 
-        print(f"Moving train from {self.current_station} to {destination_station} based on priority")
-        distance = abs(ord(self.current_station) - ord(destination_station))
-        travel_time = distance * 10  # 10 minutes per station
+        self.say(f"Moving train from {self.current_station} to {destination_station} based on priority")
+        travel_time = self.router.distance(self.current_station, destination_station)  # Shortest route in minutes
         self.current_station = destination_station
         self.total_time += travel_time
         return travel_time
@@ -104,12 +351,50 @@ class TrainSystem:
         if self.current_station == passenger.start_station and not passenger.on_board:
             self.priority_queue.add(passenger)
             passenger.on_board = True  # Mark the passenger as on board
-            print(f"New passenger from {passenger.start_station} to {passenger.destination_station} added with priority {passenger.priority}")
+            self.say(f"New passenger from {passenger.start_station} to {passenger.destination_station} added with priority {passenger.priority}")
+
+    def queue_passenger(self, passenger):
+        """Puts a passenger in line at their start station; False if the station is full."""
+        passenger.queued_at = self.total_time
+        return self.station_queues[passenger.start_station].append(passenger, self.total_time)
+
+    def board_all(self):
+        """Boards everyone waiting at the current station in a single heap pass."""
+        station = self.current_station
+        waiting = self.station_queues[station].take_all(self.total_time)
+        boarding = [passenger for passenger in waiting if not passenger.on_board]
+        now = self.total_time
+        for passenger in boarding:
+            passenger.on_board = True
+            passenger.boarded_at = now
+            if passenger.queued_at is None:
+                passenger.queued_at = now
+            self.wait_times.append(now - passenger.queued_at)
+        self.priority_queue.add_many(boarding)
+        if self.verbose:
+            if len(boarding) <= 5:
+                for passenger in boarding:
+                    print(f"New passenger from {passenger.start_station} to {passenger.destination_station} added with priority {passenger.priority}")
+            else:
+                print(f"{len(boarding)} passengers boarded at {station}")
+        return len(boarding)
+
+    def queue_stats(self):
+        return {station: queue.stats() for station, queue in self.station_queues.items()}
+
+    def queue_depth(self):
+        return sum(len(queue) for queue in self.station_queues.values())
+
+    def deliver(self, passenger):
+        if passenger.boarded_at is not None:
+            self.ride_times.append(self.total_time - passenger.boarded_at)
+            self.total_times.append(self.total_time - passenger.queued_at)
+        self.say(f"Passenger from {passenger.start_station} got off at {self.current_station} after {self.total_time} minutes")
 
     def handle_passengers(self):
-        while self.station_queues[self.current_station]: # Check for passengers at the current station and board them
-            passenger = self.station_queues[self.current_station].pop(0)  # Get the first passenger in the queue 
-            self.board_passenger(passenger)  # Attempt to board the passenger
+        self.depth_times.append(self.total_time)
+        self.depth_samples.append(self.queue_depth())
+        self.board_all()  # Board everyone waiting at the current station
 
         # Drop off passengers if any
         if not self.priority_queue.is_empty():
@@ -117,60 +402,332 @@ class TrainSystem:
 
             # Check if the current station matches the passenger's destination
             if self.current_station == passenger.destination_station:
-                print(f"Passenger from {passenger.start_station} got off at {self.current_station} after {self.total_time} minutes")
+                self.deliver(passenger)
             else:
-                print(f"Passenger from {passenger.start_station} will be dropped off at {passenger.destination_station}.")
+                self.say(f"Passenger from {passenger.start_station} will be dropped off at {passenger.destination_station}.")
                 travel_time = self.move_to_station(passenger.destination_station)
                 self.travel_times.append(travel_time)
 
                 if self.current_station == passenger.destination_station:
-                    print(f"Passenger from {passenger.start_station} got off at {self.current_station} after {self.total_time} minutes")
+                    self.deliver(passenger)
                 else:
-                    print(f"Passenger from {passenger.start_station} remains on the train, heading to {passenger.destination_station}.")
+                    self.say(f"Passenger from {passenger.start_station} remains on the train, heading to {passenger.destination_station}.")
                 
-            # Recalculate priorities for remaining passengers
-            self.priority_queue.recalculate_priorities(self.stations)
+            # Recalculate priorities for remaining passengers; trip-length priorities never change
+            if self.lazy_priorities:
+                self.priority_queue.set_reference(self.current_station)
 
     def add_emergency(self, passenger):
+        passenger.queued_at = self.total_time
         self.emergency_stack.push(passenger)
 
     def handle_emergencies(self):
         while not self.emergency_stack.is_empty():
             emergency_passenger = self.emergency_stack.pop()
-            print(f"Emergency passenger from {emergency_passenger.start_station} to {emergency_passenger.destination_station} is being escorted.")
+            self.emergency_latencies.append(self.total_time - emergency_passenger.queued_at)
+            self.say(f"Emergency passenger from {emergency_passenger.start_station} to {emergency_passenger.destination_station} is being escorted.")
 
     def average_travel_time(self):
         if self.travel_times:
             return sum(self.travel_times) / len(self.travel_times)
         return 0
 
+    def metrics(self):
+        delivered = len(self.ride_times)
+        return {
+            'boarded': len(self.wait_times),
+            'delivered': delivered,
+            'total_time': self.total_time,
+            'average_travel_time': self.average_travel_time(),
+            'average_wait_time': sum(self.wait_times) / len(self.wait_times) if self.wait_times else 0,
+            'average_ride_time': sum(self.ride_times) / delivered if delivered else 0,
+            'emergencies': len(self.emergency_latencies),
+            'max_queue_depth': max(self.depth_samples, default=0),
+        }
+
+
+# Discrete-event simulator for many trains on a station graph. Everything that
+# happens is an event on one global time-ordered heap: passengers arriving at
+# stations (a continuous Poisson process) and trains reaching stations.
+# Trains follow the same policy as TrainSystem: head for the destination of
+# the highest-priority passenger on board (priority = trip distance, 0 for
+# emergencies), and pick up whoever is waiting at each station they pass.
+PASSENGER_ARRIVAL = 0
+TRAIN_ARRIVAL = 1
+SCENARIO_ARRIVAL = 2
+
+
+class TrainNetworkSimulator:
+    def __init__(self, graph, num_trains=1, capacity=None, arrival_rate=1.0, emergency_fraction=0.2, seed=None):
+        """arrival_rate is passengers per minute over the whole network; capacity=None means unlimited."""
+        if not graph.is_connected():
+            raise ValueError("The station graph is not connected; some passengers could never be delivered.")
+        self.graph = graph
+        self.capacity = capacity
+        self.arrival_rate = arrival_rate
+        self.emergency_fraction = emergency_fraction
+        self.rng = random.Random(seed)
+        self.time = 0.0
+        self.events = []
+        self.event_count = itertools.count()  # Tie-breaker so equal times pop in push order
+
+        # Passengers are stored column-wise, indexed by passenger id
+        self.starts = array('l')
+        self.destinations = array('l')
+        self.arrival_times = array('d')
+        self.board_times = array('d')  # -1 until the passenger boards
+        self.priorities = array('d')
+        self.delivered = bytearray()
+
+        self.waiting = [deque() for _ in range(len(graph))]  # Regular passengers per station
+        self.waiting_emergency = [deque() for _ in range(len(graph))]  # Emergencies board first
+        self.oldest_waiting = deque()  # All waiting passengers in arrival order, cleaned lazily
+
+        # Trains, indexed by train id, all starting at the first station
+        self.train_positions = [0] * num_trains
+        self.train_onboard = [[] for _ in range(num_trains)]  # Heap of (priority, passenger id)
+        self.train_by_destination = [defaultdict(list) for _ in range(num_trains)]
+        self.train_load = [0] * num_trains
+        self.train_targets = [-1] * num_trains
+        self.train_dropping = [False] * num_trains  # Whether the target is a drop-off (else a pickup)
+        self.train_leg_starts = [0.0] * num_trains
+        self.idle_trains = set(range(num_trains))
+
+        # Metrics, matching TrainSystem where they overlap
+        self.travel_times = []  # Minutes of each trip a train made to drop a passenger off
+        self.pickup_times = []  # Minutes of each empty run a train made to fetch a waiting passenger
+        self.wait_times = array('d')
+        self.ride_times = array('d')
+        self.passengers_generated = 0
+        self.passengers_to_generate = 0
+
+        # Scenario playback (see TrainScenario): the chunk being read and the next passenger in it
+        self.scenario = None
+        self.scenario_chunk = None
+        self.scenario_index = 0
+        self.scenario_stations = None  # Scenario station id -> graph station id, when they differ
+
+    def schedule(self, time, kind, value):
+        heapq.heappush(self.events, (time, next(self.event_count), kind, value))
+
+    def add_passenger(self, start, destination, time, emergency=False, priority=None):
+        """Adds a passenger waiting at station id start from time on; returns the passenger id."""
+        passenger = len(self.starts)
+        self.starts.append(start)
+        self.destinations.append(destination)
+        self.arrival_times.append(time)
+        self.board_times.append(-1.0)
+        if priority is None:
+            priority = 0 if emergency else self.graph.distance_ids(destination, start)  # Routing reads destination rows too
+        self.priorities.append(priority)
+        self.delivered.append(0)
+        (self.waiting_emergency if emergency else self.waiting)[start].append(passenger)
+        self.oldest_waiting.append(passenger)
+        # Wake idle trains so they can come for the new passenger
+        if self.idle_trains:
+            for train in self.idle_trains:
+                self.schedule(time, TRAIN_ARRIVAL, train)
+            self.idle_trains.clear()
+        return passenger
+
+    def generate_arrival(self):
+        """Creates the passenger of the current arrival event and schedules the next arrival."""
+        num_stations = len(self.graph.names)
+        random_value = self.rng.random
+        start = int(random_value() * num_stations)
+        destination = int(random_value() * (num_stations - 1))
+        if destination >= start:
+            destination += 1  # Uniform over every station except the start
+        self.add_passenger(start, destination, self.time, random_value() < self.emergency_fraction)
+        self.passengers_generated += 1
+        if self.passengers_generated < self.passengers_to_generate:
+            self.schedule(self.time + self.rng.expovariate(self.arrival_rate), PASSENGER_ARRIVAL, 0)
+
+    def load_scenario(self, chunks, stations=None):
+        """Takes arrivals from scenario chunks instead of generating them.
+
+        stations are the scenario's station names; they are matched to the graph by name.
+        """
+        self.scenario = iter(chunks)
+        self.scenario_chunk = None
+        self.scenario_index = 0
+        self.scenario_stations = None
+        if stations is not None and list(stations) != self.graph.names:
+            self.scenario_stations = [self.graph.ids[name] for name in stations]
+        self.schedule_scenario_arrival()
+
+    def schedule_scenario_arrival(self):
+        chunk = self.scenario_chunk
+        while chunk is None or self.scenario_index >= len(chunk):
+            chunk = self.scenario_chunk = next(self.scenario, None)
+            self.scenario_index = 0
+            if chunk is None:
+                self.scenario = None
+                return
+        self.schedule(chunk.times[self.scenario_index], SCENARIO_ARRIVAL, 0)
+
+    def scenario_arrival(self):
+        chunk, i = self.scenario_chunk, self.scenario_index
+        start, destination = chunk.starts[i], chunk.destinations[i]
+        if self.scenario_stations is None:
+            self.add_passenger(start, destination, self.time, chunk.emergency[i], chunk.priorities[i])
+        else:
+            start, destination = self.scenario_stations[start], self.scenario_stations[destination]
+            self.add_passenger(start, destination, self.time, chunk.emergency[i])  # Priorities come from this graph
+        self.scenario_index = i + 1
+        self.schedule_scenario_arrival()
+
+    def train_arrives(self, train):
+        station = self.train_positions[train]
+        now = self.time
+        board_times = self.board_times
+        onboard = self.train_onboard[train]
+        by_destination = self.train_by_destination[train]
+        load = self.train_load[train]
+
+        # Drop off everyone who is going here
+        dropped = by_destination.pop(station, None)
+        if dropped:
+            delivered = self.delivered
+            ride_times = self.ride_times
+            for passenger in dropped:
+                delivered[passenger] = 1
+                ride_times.append(now - board_times[passenger])
+            load -= len(dropped)
+        if self.train_targets[train] == station:
+            if not self.train_dropping[train]:
+                self.pickup_times.append(now - self.train_leg_starts[train])
+            elif dropped:
+                self.travel_times.append(now - self.train_leg_starts[train])
+            self.train_targets[train] = -1
+
+        # Board emergencies first, then the regular queue, up to capacity
+        capacity = self.capacity
+        for queue in (self.waiting_emergency[station], self.waiting[station]):
+            if not queue:
+                continue
+            arrival_times = self.arrival_times
+            priorities = self.priorities
+            destinations = self.destinations
+            wait_times = self.wait_times
+            while queue and (capacity is None or load < capacity):
+                passenger = queue.popleft()
+                board_times[passenger] = now
+                wait_times.append(now - arrival_times[passenger])
+                heapq.heappush(onboard, (priorities[passenger], passenger))
+                by_destination[destinations[passenger]].append(passenger)
+                load += 1
+        self.train_load[train] = load
+
+        # Head for the top-priority passenger on board, else for the longest-waiting passenger
+        delivered = self.delivered
+        while onboard and delivered[onboard[0][1]]:
+            heapq.heappop(onboard)
+        dropping = bool(onboard)
+        if dropping:
+            target = self.destinations[onboard[0][1]]
+        else:
+            oldest_waiting = self.oldest_waiting
+            while oldest_waiting and board_times[oldest_waiting[0]] >= 0:
+                oldest_waiting.popleft()
+            target = self.starts[oldest_waiting[0]] if oldest_waiting else -1
+        if target < 0 or target == station:
+            self.idle_trains.add(train)
+            return
+        if target != self.train_targets[train]:
+            # A new leg starts unless the train was already carrying passengers and only changed destination
+            if self.train_targets[train] < 0 or dropping != self.train_dropping[train]:
+                self.train_leg_starts[train] = now
+            self.train_targets[train] = target
+            self.train_dropping[train] = dropping
+        hop = self.graph.next_hop_id(station, target)
+        self.train_positions[train] = hop
+        heapq.heappush(self.events, (now + self.graph.edges[station][hop], next(self.event_count), TRAIN_ARRIVAL, train))
+
+    def run(self, num_passengers, until=None):
+        """Generates num_passengers arrivals and runs until all are delivered (or until the given time)."""
+        self.passengers_to_generate += num_passengers
+        if num_passengers:
+            self.schedule(self.time + self.rng.expovariate(self.arrival_rate), PASSENGER_ARRIVAL, 0)
+        while self.events:
+            time, _, kind, value = self.events[0]
+            if until is not None and time > until:
+                break
+            heapq.heappop(self.events)
+            self.time = time
+            if kind == TRAIN_ARRIVAL:
+                self.train_arrives(value)
+            elif kind == PASSENGER_ARRIVAL:
+                self.generate_arrival()
+            else:
+                self.scenario_arrival()
+        return self.metrics()
 
-stations = ['A', 'B', 'C', 'D']  
-train_system = TrainSystem(stations)
-
-# Generate and queue random passengers for the initial cycle
-num_passengers = 8
-random_passengers = generate_passengers(num_passengers, stations)
-
-# Introduce emergency passengers (20% of total passengers)
-num_emergency_passengers = int(num_passengers * 0.2)
-emergency_passengers = generate_emergency_passengers(num_emergency_passengers, stations)
+    def run_scenario(self, chunks, stations=None, until=None):
+        """Plays every passenger of a scenario (e.g. ScenarioFile.chunks()) and runs until all are delivered."""
+        self.load_scenario(chunks, stations)
+        return self.run(0, until)
 
-# Add emergency passengers to the emergency stack
-for passenger in emergency_passengers:
-    train_system.add_emergency(passenger)
+    @property
+    def total_time(self):
+        return self.time
 
-# Queue regular passengers at their starting stations
-for passenger in random_passengers:
-    train_system.station_queues[passenger.start_station].append(passenger)
+    def average_travel_time(self):
+        """Same metric as TrainSystem.average_travel_time: mean minutes per drop-off trip."""
+        if self.travel_times:
+            return sum(self.travel_times) / len(self.travel_times)
+        return 0
 
-# Simulate cycles
-for i in range(5):  
-    train_system.print_cycle_header()  # Log cycle info
-    train_system.handle_passengers()  # Handle movement and drop-offs
-    train_system.handle_emergencies()  # Handle emergency passengers
-    print("")
+    def average_pickup_time(self):
+        """Mean minutes per empty run to fetch a waiting passenger (TrainSystem has no such runs)."""
+        if self.pickup_times:
+            return sum(self.pickup_times) / len(self.pickup_times)
+        return 0
 
-# Get average travel time
-print(f"\nAverage travel time: {train_system.average_travel_time()} minutes")
-print(f"Total time elapsed: {train_system.total_time} minutes")
+    def metrics(self):
+        delivered = len(self.ride_times)
+        return {
+            'passengers': len(self.starts),
+            'delivered': delivered,
+            'total_time': self.total_time,
+            'average_travel_time': self.average_travel_time(),
+            'average_pickup_time': self.average_pickup_time(),
+            'average_wait_time': sum(self.wait_times) / len(self.wait_times) if self.wait_times else 0,
+            'average_ride_time': sum(self.ride_times) / delivered if delivered else 0,
+        }
+
+
+def main():
+    stations = ['A', 'B', 'C', 'D']
+    train_system = TrainSystem(stations)
+
+    # Generate and queue random passengers for the initial cycle
+    num_passengers = 8
+    random_passengers = generate_passengers(num_passengers, stations, router=train_system.router)
+
+    # Introduce emergency passengers (20% of total passengers)
+    num_emergency_passengers = int(num_passengers * 0.2)
+    emergency_passengers = generate_emergency_passengers(num_emergency_passengers, stations)
+
+    # Add emergency passengers to the emergency stack
+    for passenger in emergency_passengers:
+        train_system.add_emergency(passenger)
+
+    # Queue regular passengers at their starting stations
+    for passenger in random_passengers:
+        train_system.queue_passenger(passenger)
+
+    # Simulate cycles
+    for i in range(5):
+        train_system.print_cycle_header()  # Log cycle info
+        train_system.handle_passengers()  # Handle movement and drop-offs
+        train_system.handle_emergencies()  # Handle emergency passengers
+        print("")
+
+    # Get average travel time
+    print(f"\nAverage travel time: {train_system.average_travel_time()} minutes")
+    print(f"Total time elapsed: {train_system.total_time} minutes")
+
+
+if __name__ == "__main__":
+    main()
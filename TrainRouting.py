@@ -0,0 +1,253 @@
+import argparse
+import csv
+import heapq
+import random
+import time
+from array import array
+from collections import OrderedDict
+
+INFINITY = float('inf')
+
+
+# Station graph: any station names, weighted edges in minutes. Stations are
+# numbered internally so the simulators can keep everything in flat lists.
+class StationGraph:
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self.edges = []  # Per station: {neighbour id: minutes}
+        self._planner = None  # RoutePlanner, built on first use and dropped when the graph changes
+
+    def add_station(self, name):
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.edges.append({})
+            self._planner = None
+        return self.ids[name]
+
+    def add_edge(self, a, b, minutes):
+        a, b = self.add_station(a), self.add_station(b)
+        self.edges[a][b] = minutes
+        self.edges[b][a] = minutes
+        self._planner = None
+
+    @classmethod
+    def line(cls, stations, minutes_per_stop=10):
+        """Stations in a straight line, like the original 'A'-'D' system (10 minutes per stop)."""
+        graph = cls()
+        for station in stations:
+            graph.add_station(station)
+        for a, b in zip(stations, stations[1:]):
+            graph.add_edge(a, b, minutes_per_stop)
+        return graph
+
+    @classmethod
+    def random_network(cls, num_stations, extra_edges=None, min_minutes=2, max_minutes=15, rng=random):
+        """A connected random network: a ring of stations plus random shortcuts."""
+        graph = cls()
+        names = [f"S{i:05d}" for i in range(num_stations)]
+        for name in names:
+            graph.add_station(name)
+        for i in range(1, num_stations):
+            graph.add_edge(names[i - 1], names[i], rng.randint(min_minutes, max_minutes))
+        if num_stations > 2:
+            graph.add_edge(names[-1], names[0], rng.randint(min_minutes, max_minutes))
+        for _ in range(num_stations // 2 if extra_edges is None else extra_edges):
+            a, b = rng.sample(range(num_stations), 2)
+            graph.add_edge(names[a], names[b], rng.randint(min_minutes, max_minutes))
+        return graph
+
+    @classmethod
+    def load(cls, csv_filename):
+        """Reads a graph from a CSV file with one 'station,station,minutes' edge per line."""
+        graph = cls()
+        with open(csv_filename, newline='', encoding='utf-8') as file:
+            for row in csv.reader(file):
+                if not row or row[0].startswith('#'):
+                    continue
+                try:
+                    minutes = float(row[2])
+                except (IndexError, ValueError):
+                    continue  # Header or malformed line
+                graph.add_edge(row[0].strip(), row[1].strip(), minutes)
+        return graph
+
+    def __len__(self):
+        return len(self.names)
+
+    def planner(self):
+        if self._planner is None:
+            self._planner = RoutePlanner(self)
+        return self._planner
+
+    def routes_from(self, source):
+        """(distances, first hops, previous stations) from station id source."""
+        return self.planner().routes_from(source)
+
+    def distance_ids(self, a, b):
+        """Travel minutes between station ids a and b (by name: RoutePlanner.distance)."""
+        return self.planner().distance_ids(a, b)
+
+    def next_hop_id(self, a, b):
+        """Id of the neighbour of a to move to on the way to b; -1 if b is a or cannot be reached."""
+        return self.planner().next_hop_id(a, b)
+
+    def is_connected(self):
+        """True if every station can reach every other one."""
+        return len(self.names) < 2 or INFINITY not in self.planner().routes_from(0)[0]
+
+
+def shortest_paths(graph, source):
+    """Dijkstra from station id source: (distances, first hops, previous stations) indexed by station id.
+
+    Distances stay a list so integer minutes come back as integers.
+    """
+    distances = [INFINITY] * len(graph.names)
+    first_hops = array('i', [-1]) * len(graph.names)
+    previous = array('i', [-1]) * len(graph.names)
+    distances[source] = 0
+    first_hops[source] = source
+    edges = graph.edges
+    heap = [(0, source)]
+    while heap:
+        distance, station = heapq.heappop(heap)
+        if distance > distances[station]:
+            continue
+        hop = first_hops[station]
+        for neighbour, minutes in edges[station].items():
+            new_distance = distance + minutes
+            if new_distance < distances[neighbour]:
+                distances[neighbour] = new_distance
+                first_hops[neighbour] = neighbour if station == source else hop
+                previous[neighbour] = station
+                heapq.heappush(heap, (new_distance, neighbour))
+    return distances, first_hops, previous
+
+
+class RoutePlanner:
+    """Shortest-path lookups for a StationGraph.
+
+    Graphs up to dense_limit stations get a full matrix up front (one Dijkstra per
+    station), so every lookup is two list indexes. Bigger graphs run Dijkstra on
+    demand and keep the last cache_size source rows (by default one per station,
+    stored as compact arrays), plus an LRU cache of paths.
+
+    Edges are two-way, so a station's row also answers routes towards it: the
+    next hop from a to b is a's predecessor in b's tree. Simulations route
+    towards a few targets from many positions, so they only need the targets' rows.
+    """
+    def __init__(self, graph, dense_limit=256, cache_size=None, path_cache_size=4096):
+        self.graph = graph
+        self.dense = len(graph) <= dense_limit
+        self.cache_size = len(graph) if cache_size is None else cache_size
+        self.path_cache_size = path_cache_size
+        self.rows = OrderedDict()  # Source id -> (distances, first hops, previous stations)
+        self.paths = OrderedDict()  # (source id, target id) -> list of station ids
+        self.hits = 0
+        self.misses = 0
+        if self.dense:
+            self.matrix = [shortest_paths(graph, source) for source in range(len(graph))]
+
+    def routes_from(self, source):
+        if self.dense:
+            return self.matrix[source]
+        rows = self.rows
+        routes = rows.get(source)
+        if routes is None:
+            self.misses += 1
+            distances, first_hops, previous = shortest_paths(self.graph, source)
+            routes = rows[source] = (array('d', distances), first_hops, previous)
+            if len(rows) > self.cache_size:
+                rows.popitem(last=False)
+        else:
+            self.hits += 1
+            rows.move_to_end(source)
+        return routes
+
+    def distance(self, a, b):
+        """Travel minutes between stations a and b, by name."""
+        ids = self.graph.ids
+        return self.distance_ids(ids[a], ids[b])
+
+    def distance_ids(self, a, b):
+        if not self.dense and a not in self.rows and b in self.rows:
+            return self.routes_from(b)[0][a]  # Edges are two-way, so b's row answers too
+        return self.routes_from(a)[0][b]
+
+    def next_hop_id(self, a, b):
+        """Id of the station to move to from a on the way to b, read from b's row; -1 if there is none."""
+        return self.routes_from(b)[2][a]
+
+    def next_hop(self, a, b):
+        """The station to move to from a on the way to b, by name; None if b cannot be reached."""
+        ids = self.graph.ids
+        hop = self.next_hop_id(ids[a], ids[b])
+        return self.graph.names[hop] if hop >= 0 else None
+
+    def path_ids(self, a, b):
+        """Station ids from a to b inclusive; empty if b cannot be reached."""
+        key = (a, b)
+        path = self.paths.get(key)
+        if path is not None:
+            self.paths.move_to_end(key)
+            return path
+        distances, _, previous = self.routes_from(a)
+        if distances[b] == INFINITY:
+            path = []
+        else:
+            path = [b]
+            while path[-1] != a:
+                path.append(previous[path[-1]])
+            path.reverse()
+        self.paths[key] = path
+        if len(self.paths) > self.path_cache_size:
+            self.paths.popitem(last=False)
+        return path
+
+    def path(self, a, b):
+        ids, names = self.graph.ids, self.graph.names
+        return [names[station] for station in self.path_ids(ids[a], ids[b])]
+
+
+def benchmark_routing(num_stations, lookups=100000, seed=0):
+    rng = random.Random(seed)
+    graph = StationGraph.random_network(num_stations, rng=rng)
+    start = time.perf_counter()
+    planner = graph.planner()
+    build_time = time.perf_counter() - start
+    # Large networks are looked up from a working set of stations that fits the row cache
+    sources = graph.names if planner.dense else rng.sample(graph.names, min(num_stations, 512))
+    pairs = [(rng.choice(sources), rng.choice(graph.names)) for _ in range(lookups)]
+    start = time.perf_counter()
+    for a, b in pairs:
+        planner.distance(a, b)
+    lookup_time = time.perf_counter() - start
+    mode = 'matrix' if planner.dense else 'on demand'
+    print(f"{num_stations} stations ({mode}): built in {build_time:.3f}s, "
+          f"{lookups / lookup_time:,.0f} distance lookups/sec")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shortest routes on a train network.")
+    parser.add_argument('edges', nargs='?', help="CSV file of 'station,station,minutes' edges")
+    parser.add_argument('route', nargs='*', help="Two station names to route between")
+    parser.add_argument('--benchmark', type=int, nargs='+', metavar='STATIONS',
+                        help="Time planner builds and lookups on random networks of these sizes")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        for size in args.benchmark:
+            benchmark_routing(size)
+    elif args.edges and len(args.route) == 2:
+        graph = StationGraph.load(args.edges)
+        planner = graph.planner()
+        a, b = args.route
+        if a not in graph.ids or b not in graph.ids:
+            print("Unknown station.")
+        elif planner.distance(a, b) == INFINITY:
+            print(f"No route from {a} to {b}.")
+        else:
+            print(f"{' -> '.join(planner.path(a, b))} ({planner.distance(a, b):g} minutes)")
+    else:
+        parser.print_help()
@@ -0,0 +1,170 @@
+import argparse
+import random
+import struct
+import sys
+import time
+from array import array
+from itertools import accumulate, repeat
+
+from TrainRouting import StationGraph
+
+# Scenario file: the passengers of a simulation, stored column by column in
+# chunks so it can be written and read as a stream.
+#   header   magic, version, number of stations, number of passengers
+#   stations one length-prefixed UTF-8 name each, in station id order
+#   chunks   passenger count, then the columns of that chunk: arrival times
+#            (float64), starts and destinations (int32), priorities (float32)
+#            and emergency flags (one byte each)
+# Columns are little-endian. A passenger takes 21 bytes.
+SCENARIO_MAGIC = b'TRSC'
+SCENARIO_VERSION = 1
+SCENARIO_HEADER = struct.Struct('<4sIIQ')
+STATION_NAME = struct.Struct('<H')
+CHUNK_HEADER = struct.Struct('<I')
+
+
+class ScenarioChunk:
+    """A time-ordered run of passengers, one array per column."""
+    __slots__ = ('times', 'starts', 'destinations', 'priorities', 'emergency')
+
+    def __init__(self, times, starts, destinations, priorities, emergency):
+        self.times = times
+        self.starts = starts
+        self.destinations = destinations
+        self.priorities = priorities
+        self.emergency = emergency
+
+    def __len__(self):
+        return len(self.times)
+
+
+def generate_scenario(graph, num_passengers, arrival_rate=1.0, emergency_fraction=0.2, seed=None,
+                      chunk_size=65536, start_time=0.0):
+    """Yields ScenarioChunks of random passengers on graph, drawn a whole column at a time.
+
+    Arrivals are a Poisson process (arrival_rate passengers per minute), starts are
+    uniform, destinations are uniform over the other stations, and priorities are the
+    trip distance (0 for emergencies), as in TrainNetworkSimulator.
+    """
+    rng = random.Random(seed)
+    num_stations = len(graph)
+    if num_stations < 2:
+        raise ValueError("A scenario needs at least two stations.")
+    last_time = start_time
+    remaining = num_passengers
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        remaining -= size
+        uniform = rng.random
+        gaps = [rng.expovariate(arrival_rate) for _ in repeat(None, size)]
+        times = array('d', accumulate(gaps, initial=last_time))
+        times.pop(0)
+        last_time = times[-1]
+        starts = array('i', [int(uniform() * num_stations) for _ in repeat(None, size)])
+        destinations = array('i', [int(uniform() * (num_stations - 1)) for _ in repeat(None, size)])
+        for i, start in enumerate(starts):
+            if destinations[i] >= start:
+                destinations[i] += 1  # Uniform over every station except the start
+        emergency = bytearray([uniform() < emergency_fraction for _ in repeat(None, size)])
+        priorities = array('f', [0 if emergency[i] else graph.distance_ids(start, destinations[i])
+                                 for i, start in enumerate(starts)])
+        yield ScenarioChunk(times, starts, destinations, priorities, emergency)
+
+
+def _little_endian(column):
+    if sys.byteorder == 'big':
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column
+
+
+def save_scenario(path, station_names, chunks):
+    """Writes chunks (any iterable of ScenarioChunk) to path; returns the number of passengers."""
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(SCENARIO_HEADER.pack(SCENARIO_MAGIC, SCENARIO_VERSION, len(station_names), 0))
+        for name in station_names:
+            encoded = name.encode('utf-8')
+            f.write(STATION_NAME.pack(len(encoded)))
+            f.write(encoded)
+        for chunk in chunks:
+            f.write(CHUNK_HEADER.pack(len(chunk)))
+            for column in (chunk.times, chunk.starts, chunk.destinations, chunk.priorities):
+                f.write(_little_endian(column).tobytes())
+            f.write(chunk.emergency)
+            count += len(chunk)
+        f.seek(0)
+        f.write(SCENARIO_HEADER.pack(SCENARIO_MAGIC, SCENARIO_VERSION, len(station_names), count))
+    return count
+
+
+class ScenarioFile:
+    """Reads a scenario file back, one chunk at a time."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        magic, version, num_stations, self.num_passengers = SCENARIO_HEADER.unpack(self.file.read(SCENARIO_HEADER.size))
+        if magic != SCENARIO_MAGIC or version != SCENARIO_VERSION:
+            self.file.close()
+            raise ValueError(f"'{path}' is not a train scenario (version {SCENARIO_VERSION}).")
+        self.stations = []
+        for _ in range(num_stations):
+            length, = STATION_NAME.unpack(self.file.read(STATION_NAME.size))
+            self.stations.append(self.file.read(length).decode('utf-8'))
+        self.data_start = self.file.tell()
+
+    def chunks(self):
+        """Yields every ScenarioChunk in time order."""
+        f = self.file
+        f.seek(self.data_start)
+        while True:
+            header = f.read(CHUNK_HEADER.size)
+            if not header:
+                return
+            size, = CHUNK_HEADER.unpack(header)
+            columns = []
+            for typecode in ('d', 'i', 'i', 'f'):
+                column = array(typecode)
+                column.frombytes(f.read(size * column.itemsize))
+                columns.append(_little_endian(column))
+            yield ScenarioChunk(*columns, bytearray(f.read(size)))
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate or inspect train simulator scenario files.")
+    parser.add_argument('path', help="Scenario file")
+    parser.add_argument('--passengers', type=int, help="Generate a scenario with this many passengers")
+    parser.add_argument('--stations', type=int, default=200, help="Stations in the random network")
+    parser.add_argument('--network-seed', type=int, default=0, help="Seed of the random network")
+    parser.add_argument('--seed', type=int, default=None, help="Seed of the passengers")
+    parser.add_argument('--rate', type=float, default=1.0, help="Passengers per minute")
+    parser.add_argument('--emergency', type=float, default=0.2, help="Fraction of emergency passengers")
+    parser.add_argument('--chunk-size', type=int, default=65536)
+    args = parser.parse_args()
+
+    if args.passengers is not None:
+        graph = StationGraph.random_network(args.stations, rng=random.Random(args.network_seed))
+        start = time.perf_counter()
+        chunks = generate_scenario(graph, args.passengers, args.rate, args.emergency, args.seed, args.chunk_size)
+        count = save_scenario(args.path, graph.names, chunks)
+        print(f"Wrote {count:,} passengers to {args.path} in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    with ScenarioFile(args.path) as scenario:
+        last_time = 0.0
+        emergencies = 0
+        for chunk in scenario.chunks():
+            last_time = chunk.times[-1]
+            emergencies += sum(chunk.emergency)
+        print(f"{scenario.num_passengers:,} passengers ({emergencies:,} emergencies) at {len(scenario.stations)} stations, "
+              f"arriving over {last_time:,.0f} minutes; read in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,201 @@
+import argparse
+import csv
+import itertools
+import json
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from TrainRouting import StationGraph
+from labs import load_lab
+
+
+def train_module():
+    """The Week 7 lab module (its file name is not a valid module name, so labs loads it by path)."""
+    return load_lab('train')
+
+
+class Histogram:
+    """Counts of values in fixed-width buckets; histograms of the same width can be merged."""
+
+    def __init__(self, bucket_width=1.0):
+        self.bucket_width = bucket_width
+        self.counts = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+
+    def add_many(self, values):
+        width = self.bucket_width
+        counts = self.counts
+        for value in values:
+            counts[int(value // width)] += 1
+            self.total += value
+        self.count += len(values)
+
+    def merge(self, other):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] += count
+        self.count += other.count
+        self.total += other.total
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        """Lower edge of the bucket holding the p-th percentile (0 < p <= 100)."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return bucket * self.bucket_width
+        return max(self.counts) * self.bucket_width
+
+
+SWEEP_METRICS = ('wait', 'ride', 'total', 'emergency')
+SCHEDULES = {'trip': False, 'nearest': True}  # Schedule name -> TrainSystem lazy_priorities
+
+
+def run_config(config, seed):
+    """Worker: runs one seeded TrainSystem quietly and returns its histograms and queue-depth series."""
+    module = train_module()
+    rng = random.Random(seed)
+    if config['network'] == 'line':
+        graph = StationGraph.line([f"S{i:03d}" for i in range(config['stations'])])
+    else:
+        graph = StationGraph.random_network(config['stations'], rng=rng)
+    system = module.TrainSystem(graph.names, lazy_priorities=SCHEDULES[config['schedule']],
+                                queue_capacity=config['capacity'], verbose=False, graph=graph)
+    emergency_fraction = config['emergency']
+    for _ in range(config['cycles']):
+        for start, destination in module.random_trips(config['arrivals'], graph.names, rng):
+            if rng.random() < emergency_fraction:
+                system.add_emergency(module.Passenger(start, destination, 0))
+            else:
+                system.queue_passenger(module.Passenger(start, destination, 0))
+        system.handle_passengers()
+        system.handle_emergencies()
+
+    histograms = {name: Histogram(config['bucket']) for name in SWEEP_METRICS}
+    histograms['wait'].add_many(system.wait_times)
+    histograms['ride'].add_many(system.ride_times)
+    histograms['total'].add_many(system.total_times)
+    histograms['emergency'].add_many(system.emergency_latencies)
+    return {
+        'histograms': histograms,
+        'depths': list(system.depth_samples),
+        'delivered': len(system.ride_times),
+        'rejected': sum(queue.rejected for queue in system.station_queues.values()),
+        'total_time': system.total_time,
+    }
+
+
+def sweep_configs(stations, schedules, arrivals, emergency, cycles, network='line', capacity=None, bucket=1.0):
+    """Every combination of the given parameter lists, as config dicts."""
+    return [
+        {'stations': n, 'schedule': schedule, 'arrivals': k, 'emergency': fraction, 'cycles': cycles,
+         'network': network, 'capacity': capacity, 'bucket': bucket}
+        for n, schedule, k, fraction in itertools.product(stations, schedules, arrivals, emergency)
+    ]
+
+
+def run_sweep(configs, seeds, workers=None, master_seed=0):
+    """Runs every config with seeds seeds in a process pool; returns one merged result per config."""
+    tasks = [(i, config, random.Random(f"{master_seed}-{i}-{run}").getrandbits(64))
+             for i, config in enumerate(configs) for run in range(seeds)]
+    results = [None] * len(configs)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [(i, executor.submit(run_config, config, seed)) for i, config, seed in tasks]
+        for i, future in futures:
+            run = future.result()
+            merged = results[i]
+            if merged is None:
+                results[i] = {'config': configs[i], 'histograms': run['histograms'], 'depth_series': [run['depths']],
+                              'delivered': run['delivered'], 'rejected': run['rejected'],
+                              'total_time': run['total_time'], 'runs': 1}
+                continue
+            for name in SWEEP_METRICS:
+                merged['histograms'][name].merge(run['histograms'][name])
+            merged['depth_series'].append(run['depths'])
+            merged['delivered'] += run['delivered']
+            merged['rejected'] += run['rejected']
+            merged['total_time'] += run['total_time']
+            merged['runs'] += 1
+    for result in results:
+        series = result.pop('depth_series')
+        result['mean_depth'] = [sum(column) / len(column) for column in zip(*series)]
+    return results
+
+
+def result_row(result):
+    """One flat row of the results table: the config, then counts and latency percentiles."""
+    config = result['config']
+    row = {key: config[key] for key in ('stations', 'schedule', 'arrivals', 'emergency', 'cycles')}
+    row['runs'] = result['runs']
+    row['delivered'] = result['delivered']
+    row['rejected'] = result['rejected']
+    for name in SWEEP_METRICS:
+        histogram = result['histograms'][name]
+        row[f'{name}_mean'] = round(histogram.mean(), 2)
+        for p in (50, 95, 99):
+            row[f'{name}_p{p}'] = histogram.percentile(p)
+    depths = result['mean_depth']
+    row['depth_mean'] = round(sum(depths) / len(depths), 2) if depths else 0
+    row['depth_max'] = round(max(depths, default=0), 2)
+    return row
+
+
+def write_results(path, results):
+    rows = [result_row(result) for result in results]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_depth_series(path, results, points=200):
+    """JSON lines: each config with its mean queue depth per cycle, thinned to at most points samples."""
+    with open(path, 'w', encoding='utf-8') as f:
+        for result in results:
+            depths = result['mean_depth']
+            step = max(1, len(depths) // points)
+            f.write(json.dumps({'config': result['config'], 'step': step,
+                                'depths': [round(depth, 2) for depth in depths[::step]]}) + '\n')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep over TrainSystem configurations.")
+    parser.add_argument('--stations', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--schedules', nargs='+', choices=sorted(SCHEDULES), default=sorted(SCHEDULES))
+    parser.add_argument('--arrivals', type=int, nargs='+', default=[1], help="New passengers per cycle")
+    parser.add_argument('--emergency', type=float, nargs='+', default=[0.2], help="Fraction of emergency passengers")
+    parser.add_argument('--cycles', type=int, default=1000)
+    parser.add_argument('--network', choices=('line', 'random'), default='line')
+    parser.add_argument('--capacity', type=int, help="Station queue capacity")
+    parser.add_argument('--bucket', type=float, default=1.0, help="Histogram bucket width in minutes")
+    parser.add_argument('--seeds', type=int, default=8, help="Seeded runs per configuration")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', default='train_sweep.csv', help="Results table (CSV)")
+    parser.add_argument('--series', help="Also write queue-depth time series here (JSON lines)")
+    args = parser.parse_args()
+
+    configs = sweep_configs(args.stations, args.schedules, args.arrivals, args.emergency, args.cycles,
+                            args.network, args.capacity, args.bucket)
+    start = time.perf_counter()
+    results = run_sweep(configs, args.seeds, args.workers, args.seed)
+    print(f"{len(configs)} configurations x {args.seeds} seeds in {time.perf_counter() - start:.2f}s")
+    write_results(args.output, results)
+    print(f"Results written to {args.output}")
+    if args.series:
+        write_depth_series(args.series, results)
+        print(f"Queue depth series written to {args.series}")
+    for result in results:
+        row = result_row(result)
+        print(f"{row['stations']:>4} stations {row['schedule']:>8} x{row['arrivals']}: "
+              f"wait p50/p95/p99 {row['wait_p50']:g}/{row['wait_p95']:g}/{row['wait_p99']:g}, "
+              f"total p99 {row['total_p99']:g}, emergency p99 {row['emergency_p99']:g}, "
+              f"mean depth {row['depth_mean']:g}")
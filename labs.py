@@ -0,0 +1,118 @@
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import runpy
+import subprocess
+import sys
+
+# Every lab as an importable library. Files with spaces in their names are
+# loaded by path under a valid module name; the rest are plain imports. Nothing
+# is read or built at import time: data (country index, card tables, station
+# graphs) is built when first used.
+LAB_DIR = os.path.dirname(os.path.abspath(__file__))
+LABS = {
+    # name: (module name, file)
+    'country': ('Country_BinarySearch', 'Country_BinarySearch.py'),
+    'country-server': ('Country_QueryServer', 'Country_QueryServer.py'),
+    'gofish': ('GoFishCardGame', 'GoFishCardGame.py'),
+    'gofish-tournament': ('GoFishTournament', 'GoFishTournament.py'),
+    'gofish-log': ('GoFishEventLog', 'GoFishEventLog.py'),
+    'train': ('train_priority_queue', 'Lab Week 7 - Train Priority Queue.py'),
+    'train-routing': ('TrainRouting', 'TrainRouting.py'),
+    'train-scenario': ('TrainScenario', 'TrainScenario.py'),
+    'train-sweep': ('TrainSweep', 'TrainSweep.py'),
+    'homebrew': ('home_brew_card_game', 'Home Brew Card game - Lab Week 5,6.py'),
+    'homebrew-decks': ('HomeBrewDeckBuilder', 'HomeBrewDeckBuilder.py'),
+}
+
+# Code run in a fresh interpreter by the startup benchmark: the first real query of each lab
+FIRST_QUERIES = {
+    'country': "lab.get_database().binary_search('Colombia')",
+    'train': "lab.TrainSystem(['A', 'B', 'C', 'D'], verbose=False).router.distance('A', 'D')",
+    'train-routing': "lab.StationGraph.random_network(200).distance_ids(0, 100)",
+    'homebrew': "import random; lab.play_headless_match([lab.DEFAULT_DECK] * 2, [lab.greedy_agent] * 2, random.Random(0))",
+    'gofish': "import random; lab.play_headless_game([lab.random_policy] * 2, random.Random(0))",
+}
+
+
+def load_lab(name):
+    """Imports a lab by its short name (see LABS) and returns the module; later calls reuse it."""
+    module_name, filename = LABS[name]
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    if LAB_DIR not in sys.path:
+        sys.path.insert(0, LAB_DIR)  # So the labs' own imports (TrainRouting, ...) resolve
+    if module_name + '.py' == filename:
+        return importlib.import_module(module_name)
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(LAB_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
+
+
+def run_lab(name, argv):
+    """Runs a lab's command line with the given arguments, as if its file were run directly."""
+    path = os.path.join(LAB_DIR, LABS[name][1])
+    if LAB_DIR not in sys.path:
+        sys.path.insert(0, LAB_DIR)
+    sys.argv = [path] + list(argv)
+    runpy.run_path(path, run_name='__main__')
+
+
+def measure_startup(name):
+    """Import time and first-query latency of one lab in a fresh interpreter, in milliseconds."""
+    query = FIRST_QUERIES.get(name, "pass")
+    code = (
+        "import json, sys, time\n"
+        f"sys.path.insert(0, {LAB_DIR!r})\n"
+        "start = time.perf_counter()\n"
+        "import labs\n"
+        f"lab = labs.load_lab({name!r})\n"
+        "imported = time.perf_counter()\n"
+        f"{query}\n"
+        "queried = time.perf_counter()\n"
+        "print(json.dumps({'import_ms': (imported - start) * 1000, 'first_query_ms': (queried - imported) * 1000}))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            stdin=subprocess.DEVNULL, cwd=LAB_DIR)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def benchmark_startup(names, repeat=3):
+    """Best import and first-query times of each lab over repeat fresh interpreters."""
+    results = {}
+    for name in names:
+        runs = [measure_startup(name) for _ in range(repeat)]
+        results[name] = {key: min(run[key] for run in runs) for key in runs[0]}
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in LABS:
+        run_lab(sys.argv[1], sys.argv[2:])
+        sys.exit()
+
+    parser = argparse.ArgumentParser(
+        description="Run a lab (python labs.py LAB [its arguments...]) or benchmark their startup.")
+    parser.add_argument('--list', action='store_true', help="List the labs")
+    parser.add_argument('--benchmark', nargs='*', metavar='LAB',
+                        help="Measure import and first-query latency (all labs by default)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.benchmark is not None:
+        names = args.benchmark or list(LABS)
+        for name, times in benchmark_startup(names, args.repeat).items():
+            query = "first query" if name in FIRST_QUERIES else "no query"
+            print(f"{name:>18}: import {times['import_ms']:7.1f} ms, {query} {times['first_query_ms']:7.1f} ms")
+    else:
+        for name, (_, filename) in LABS.items():
+            print(f"{name:>18}  {filename}")
@@ -0,0 +1,92 @@
+import contextlib
+import io
+import json
+import os
+import time
+
+try:
+    import fcntl  # Not on Windows; appends there are not locked
+except ImportError:
+    fcntl = None
+
+# Small helpers shared by the labs' benchmarks and their checkpoint and cache files.
+
+
+def best_time(func, repeat):
+    """Best wall-clock time of repeat calls of func(), in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def time_variants(operations, variants, repeat):
+    """Times every operation on every variant; anything they print is thrown away.
+
+    operations is {operation name: operation(variant)} and variants is {variant name: variant}.
+    Returns {operation name: {variant name: best time in seconds}}.
+    """
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, operation in operations.items():
+            results[name] = {
+                variant_name: best_time(lambda: operation(variant), repeat)
+                for variant_name, variant in variants.items()
+            }
+    return results
+
+
+def read_json_lines(path):
+    """Entries of a JSON-lines checkpoint or cache file.
+
+    A half-written last line (an interrupted or still running writer) is skipped;
+    the file itself is left alone, so reading never races a writer.
+    """
+    if not path or not os.path.exists(path):
+        return []
+    entries = []
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            entries.append(json.loads(line))
+    return entries
+
+
+def _complete_size(f, size):
+    """Size of the file up to and including its last newline."""
+    position = size
+    while position > 0:
+        start = max(0, position - 4096)
+        f.seek(start)
+        newline = f.read(position - start).rfind(b'\n')
+        if newline >= 0:
+            return start + newline + 1
+        position = start
+    return 0
+
+
+@contextlib.contextmanager
+def append_json_lines(path, header=None):
+    """Opens a JSON-lines file for appending and yields write(entry), which adds one line.
+
+    The file is locked while open, so concurrent writers never interleave. A
+    half-written last line left by an interrupted writer is cut off first. When
+    the file is empty, header (if given) is written as its first line.
+    """
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)  # Released when the file is closed
+        size = f.seek(0, os.SEEK_END)
+        complete = _complete_size(f, size)
+        if complete < size:
+            f.truncate(complete)
+
+        def write(entry):
+            f.write(json.dumps(entry).encode('utf-8') + b'\n')
+
+        if complete == 0 and header is not None:
+            write(header)
+        yield write